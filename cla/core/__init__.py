@@ -9,6 +9,7 @@ from .awareness import CognitiveAwareness, AwarenessState
 from .meta_controller import MetaController, CognitiveSensitivity, AttentionAllocation
 from .safety_gate import SafetyGate, SafetyViolation
 from .cognitive_layer import CognitiveLayer
+from .kernels import pairwise_cosine, friction_matrix
 
 __all__ = [
     'Concept',
@@ -24,6 +25,8 @@ __all__ = [
     'AttentionAllocation',
     'SafetyGate',
     'SafetyViolation',
-    'CognitiveLayer'
+    'CognitiveLayer',
+    'pairwise_cosine',
+    'friction_matrix'
 ]
 
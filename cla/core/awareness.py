@@ -141,7 +141,7 @@ class CognitiveAwareness:
     def _update_certainty(self, concepts: List[Concept]):
         """Aktualizuj poziom pewności."""
         if not concepts:
-            self.current_state['certainty'] = 0.5
+            self.current_state.certainty = 0.5
             return
         
         # Pewność zależy od:
@@ -155,7 +155,7 @@ class CognitiveAwareness:
         # Dużo emergentnych konceptów zmniejsza pewność
         certainty = avg_activation * (1 - 0.3 * emergent_ratio)
         
-        self.current_state['certainty'] = max(0.0, min(1.0, certainty))
+        self.current_state.certainty = max(0.0, min(1.0, certainty))
     
     def introspect(self, query: str = None) -> str:
         """
@@ -191,9 +191,9 @@ class CognitiveAwareness:
                    f"{'...' if unknown > 3 else ''}.")
 
         elif query == 'how_do_i_feel':
-            tone = self.current_state['emotional_tone']
-            certainty = self.current_state['certainty']
-            load = self.current_state['cognitive_load']
+            tone = self.current_state.emotional_tone
+            certainty = self.current_state.certainty
+            load = self.current_state.cognitive_load
 
             feeling = "neutral"
             if tone > 0.3:
@@ -222,10 +222,10 @@ class CognitiveAwareness:
                     'uncertain_about': len(self.meta_knowledge['uncertain'])
                 },
                 'current_state': {
-                    'emotional_tone': self.current_state['emotional_tone'],
-                    'certainty': self.current_state['certainty'],
-                    'cognitive_load': self.current_state['cognitive_load'],
-                    'context': self.current_state['context']
+                    'emotional_tone': self.current_state.emotional_tone,
+                    'certainty': self.current_state.certainty,
+                    'cognitive_load': self.current_state.cognitive_load,
+                    'context': self.current_state.context
                 },
                 'performance': {
                     'total_decisions': self.total_decisions,
@@ -244,7 +244,7 @@ class CognitiveAwareness:
         
         return {
             'can_do': has_capabilities,
-            'certainty': self.current_state['certainty'],
+            'certainty': self.current_state.certainty,
             'missing_capabilities': list(required_capabilities - self.self_model['capabilities']),
             'recommendation': 'proceed' if has_capabilities else 'learn_first'
         }
@@ -277,5 +277,5 @@ class CognitiveAwareness:
             self.self_model['current_goals'].append(goal)
     
     def __repr__(self):
-        return f"CognitiveAwareness(identity='{self.self_model['identity']}', certainty={self.current_state['certainty']:.2f})"
+        return f"CognitiveAwareness(identity='{self.self_model['identity']}', certainty={self.current_state.certainty:.2f})"
 
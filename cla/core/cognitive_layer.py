@@ -26,6 +26,18 @@ class CognitiveLayer:
     """
     
     def __init__(self, identity: str = "Cognitive AI System"):
+        self.reset(identity)
+    
+    def reset(self, identity: Optional[str] = None):
+        """
+        Wyzeruj cały stan warstwy - jak nowa instancja, bez ponownego tworzenia obiektu.
+        
+        Args:
+            identity: Nowa tożsamość; None zachowuje dotychczasową
+        """
+        if identity is None:
+            identity = self.awareness.self_model['identity']
+        
         # Warstwa 2: Pamięć
         self.concept_graph = ConceptGraph(decay_rate=0.1)
         
@@ -55,12 +67,56 @@ class CognitiveLayer:
         Returns:
             Dict z decyzją, wyjaśnieniem, świadomością
         """
+        concepts = [create_concept_from_dict(concept_data) for concept_data in input_concepts]
+        return self._run_cycle(concepts, context)
+    
+    def process_batch(
+        self,
+        embeddings: np.ndarray,
+        activations: np.ndarray,
+        names: List[str],
+        categories: Optional[List[Optional[str]]] = None,
+        properties: Optional[List[Dict[str, Any]]] = None,
+        context: str = ""
+    ) -> Dict[str, Any]:
+        """
+        Pełny cykl poznawczy dla wsadu w układzie SoA - bez słownika na każdy koncept.
+        
+        Args:
+            embeddings: Macierz [N, D]; float32 C-contiguous przechodzi bez kopii,
+                        a koncepty dostają jej wiersze jako widoki
+            activations: Wektor [N] aktywacji
+            names: N nazw konceptów
+            categories: Opcjonalnie N kategorii dualności
+            properties: Opcjonalnie N słowników właściwości
+            context: Kontekst sytuacyjny
+        
+        Returns:
+            Dict jak w process()
+        """
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        activations = np.asarray(activations).tolist()
+        n = len(names)
+        if embeddings.ndim != 2 or embeddings.shape[0] != n or len(activations) != n:
+            raise ValueError(f"process_batch: niezgodne rozmiary (names={n}, embeddings={embeddings.shape}, activations={len(activations)})")
+        if categories is None:
+            categories = [None] * n
+        if properties is None:
+            properties = [None] * n
+        
+        concepts = [
+            Concept(name=name, embedding=embedding, activation=activation,
+                    duality_category=category, properties=props if props is not None else {})
+            for name, embedding, activation, category, props
+            in zip(names, embeddings, activations, categories, properties)
+        ]
+        return self._run_cycle(concepts, context)
+    
+    def _run_cycle(self, concepts: List[Concept], context: str) -> Dict[str, Any]:
+        """Fazy 1-7 cyklu poznawczego dla gotowych obiektów Concept."""
         # === FAZA 1: DODAJ KONCEPTY DO GRAFU ===
-        concepts = []
-        for concept_data in input_concepts:
-            concept = create_concept_from_dict(concept_data)
-            concept_id = self.concept_graph.add_concept(concept)
-            concepts.append(concept)
+        for concept in concepts:
+            self.concept_graph.add_concept(concept)
         
         # === FAZA 2: SPREADING ACTIVATION ===
         # Aktywuj koncepty i propaguj po grafie
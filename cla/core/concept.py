@@ -57,6 +57,12 @@ class Concept:
     # Kategoria dualności
     duality_category: Optional[str] = None  # 'emotional', 'cognitive', 'moral'
     
+    def __post_init__(self):
+        # Embeddingi jako ciągłe float32: połowa pamięci i przepustowości przy iloczynach skalarnych.
+        # Jedyny punkt konwersji - ciągły wektor float32 (np. wiersz z process_batch) przechodzi bez kopii
+        if self.embedding is not None:
+            self.embedding = np.ascontiguousarray(self.embedding, dtype=np.float32)
+    
     def activate(self, strength: float = 1.0):
         """Aktywuj koncept z daną siłą."""
         self.activation = min(1.0, self.activation + strength)
@@ -147,19 +153,22 @@ class DualityPair:
 
 def create_concept_from_dict(data: Dict[str, Any]) -> Concept:
     """Helper do tworzenia konceptu z dictionary."""
-    embedding = data.get('embedding')
-    if embedding is not None and not isinstance(embedding, np.ndarray):
-        embedding = np.array(embedding)
+    # Linki z JSON przychodzą jako listy [strength, rel_type]
+    links = {cid: tuple(link) for cid, link in (data.get('links') or {}).items()}
+    
+    extra = {'concept_id': data['concept_id']} if data.get('concept_id') else {}
     
     return Concept(
         name=data['name'],
-        embedding=embedding,
+        **extra,
+        embedding=data.get('embedding'),  # Konwersja do float32 w Concept.__post_init__
         properties=data.get('properties', {}),
         activation=data.get('activation', 0.0),
         weight=data.get('weight', 0.5),
         depth=data.get('depth', 0.5),
         valence=data.get('valence', 0.0),
         is_incubating=data.get('is_incubating', False),
+        links=links,
         duality_category=data.get('duality_category')
     )
 
@@ -8,7 +8,13 @@ from typing import Dict, List, Set, Optional, Tuple
 from collections import defaultdict
 import networkx as nx
 
+try:
+    import hnswlib  # Opcjonalne: indeks ANN (HNSW) dla dużych grafów
+except ImportError:
+    hnswlib = None
+
 from .concept import Concept, DualityPair
+from .kernels import pairwise_cosine, friction_matrix
 
 
 class ConceptGraph:
@@ -19,37 +25,193 @@ class ConceptGraph:
     ale strukturę znaczeń i relacji między nimi.
     """
     
+    # Od tej liczby konceptów find_similar_concepts korzysta z indeksu HNSW (jeśli hnswlib dostępny)
+    ANN_MIN_CONCEPTS = 300
+    
+    # Flagi z properties utrzymywane w indeksie by_flag (zmieniane przez set_flag)
+    INDEXED_FLAGS = ('is_fluid_dna',)
+    
     def __init__(self, decay_rate: float = 0.1):
         self.concepts: Dict[str, Concept] = {}  # {concept_id: Concept}
         self.decay_rate = decay_rate
         
+        # Indeks nazw (lowercase) - wyszukiwanie słów w O(1) zamiast skanu grafu
+        self._name_index: Dict[str, Concept] = {}  # {name.lower(): Concept}
+        
+        # Indeksy wtórne - dict jako uporządkowany zbiór ID (kolejność dodania)
+        self.by_type: Dict[str, Dict[str, None]] = defaultdict(dict)  # {properties["type"]: {concept_id}}
+        self.by_flag: Dict[str, Dict[str, None]] = defaultdict(dict)  # {flaga: {concept_id}}
+        
+        # Koncepty zmienione od ostatniego zapisu (zapis przyrostowy)
+        self._dirty_ids: Set[str] = set()
+        # Licznik zmian grafu - klucz unieważniający cache zależne od jego treści
+        self.revision = 0
+        self._dna_cache: List[Concept] = []
+        self._dna_cache_rev = -1
+        
+        # Indeks ANN (budowany leniwie przy pierwszym zapytaniu na dużym grafie)
+        self._ann = None
+        self._ann_dim = 0
+        self._ann_labels: Dict[str, int] = {}  # {concept_id: label}
+        self._ann_ids: List[Optional[str]] = []  # label -> concept_id
+        self._ann_live = 0
+        
         # NetworkX graph dla zaawansowanych operacji
         self.graph = nx.DiGraph()  # Skierowany dla relacji hierarchicznych
         self.current_era = "genesis"
     
     def add_concept(self, concept: Concept) -> str:
         """Dodaj koncept do grafu."""
+        previous = self.concepts.get(concept.concept_id)
+        if previous is not None:
+            self._unindex_name(previous)
+            self._unindex_props(previous)
         self.concepts[concept.concept_id] = concept
+        self._name_index[concept.name.lower()] = concept
+        self._index_props(concept)
         self.graph.add_node(concept.concept_id, concept=concept)
+        self._touch(concept.concept_id)
+        if self._ann is not None:
+            self._ann_add(concept)
         return concept.concept_id
 
     def remove_concept(self, concept_id: str):
         """Usuń koncept z grafu."""
         if concept_id in self.concepts:
-            del self.concepts[concept_id]
+            concept = self.concepts.pop(concept_id)
+            self._unindex_name(concept)
+            self._unindex_props(concept)
+            self._touch(concept_id)
+            self._ann_remove(concept_id)
         if self.graph.has_node(concept_id):
             self.graph.remove_node(concept_id)
+
+    def _index_props(self, concept: Concept):
+        """Dodaj koncept do indeksów by_type / by_flag."""
+        props = concept.properties or {}
+        ctype = props.get("type")
+        if ctype:
+            self.by_type[ctype][concept.concept_id] = None
+        for flag in self.INDEXED_FLAGS:
+            if props.get(flag):
+                self.by_flag[flag][concept.concept_id] = None
+
+    def _unindex_props(self, concept: Concept):
+        """Usuń koncept z indeksów by_type / by_flag."""
+        ctype = (concept.properties or {}).get("type")
+        if ctype:
+            self.by_type[ctype].pop(concept.concept_id, None)
+        for flag in self.INDEXED_FLAGS:
+            self.by_flag[flag].pop(concept.concept_id, None)
+
+    def concepts_of_type(self, ctype: str) -> List[Concept]:
+        """Koncepty o danym properties["type"] - bez skanu całego grafu."""
+        return [self.concepts[cid] for cid in self.by_type.get(ctype, ())]
+
+    def get_dna_concepts(self) -> List[Concept]:
+        """
+        Koncepty o wadze > 0.8 (DNA i silne wspomnienia), w kolejności grafu.
+        Lista liczona raz na rewizję grafu - zmiany weight poza grafem wymagają mark_dirty.
+        """
+        if self._dna_cache_rev != self.revision:
+            self._dna_cache = [c for c in self.concepts.values() if c.weight > 0.8]
+            self._dna_cache_rev = self.revision
+        return list(self._dna_cache)
+
+    def flagged(self, flag: str) -> List[Concept]:
+        """Koncepty z ustawioną flagą z INDEXED_FLAGS."""
+        return [self.concepts[cid] for cid in self.by_flag.get(flag, ())]
+
+    def set_flag(self, concept_id: str, flag: str, value: bool):
+        """Ustaw flagę w properties konceptu (z aktualizacją indeksu by_flag)."""
+        concept = self.concepts.get(concept_id)
+        if concept is None:
+            return
+        concept.properties[flag] = value
+        if value:
+            self.by_flag[flag][concept_id] = None
+        else:
+            self.by_flag[flag].pop(concept_id, None)
+        self._touch(concept_id)
+
+    def mark_dirty(self, concept_id: str):
+        """Oznacz koncept jako zmieniony (np. po bezpośredniej zmianie weight/depth/properties)."""
+        self._touch(concept_id)
+
+    def _touch(self, concept_id: str):
+        """Zarejestruj zmianę konceptu: zbiór do zapisu przyrostowego + nowa rewizja grafu."""
+        self._dirty_ids.add(concept_id)
+        self.revision += 1
+
+    def pop_dirty(self) -> Set[str]:
+        """Zwróć i wyczyść zbiór ID zmienionych od ostatniego zapisu (usunięte nie są już w grafie)."""
+        dirty, self._dirty_ids = self._dirty_ids, set()
+        return dirty
+
+    def _unindex_name(self, concept: Concept):
+        """Usuń koncept z indeksu nazw (tylko jeśli wpis wskazuje na niego)."""
+        key = concept.name.lower()
+        if self._name_index.get(key) is concept:
+            del self._name_index[key]
     
     def get_concept(self, concept_id: str) -> Optional[Concept]:
         """Pobierz koncept po ID."""
         return self.concepts.get(concept_id)
     
     def find_concept_by_name(self, name: str) -> Optional[Concept]:
-        """Znajdź koncept po nazwie."""
+        """Znajdź koncept po nazwie (bez rozróżniania wielkości liter) - jedno trafienie w indeks nazw."""
+        return self._name_index.get(name.lower())
+
+    def match_names(self, words) -> List[Concept]:
+        """Dopasuj słowa (lowercase) do konceptów przez indeks nazw - O(W) zamiast O(W·N)."""
+        index = self._name_index
+        return [index[w] for w in dict.fromkeys(words) if w in index]
+    
+    def update_embedding(self, concept_id: str, embedding: np.ndarray):
+        """Podmień embedding konceptu (utrzymuje spójność indeksu ANN)."""
+        concept = self.concepts.get(concept_id)
+        if concept is None:
+            return
+        concept.embedding = None if embedding is None else np.ascontiguousarray(embedding, dtype=np.float32)
+        if self._ann is not None:
+            self._ann_add(concept)
+
+    def _ann_add(self, concept: Concept):
+        """Dodaj (lub nadpisz) embedding konceptu w indeksie HNSW."""
+        emb = concept.embedding
+        if emb is None or emb.shape != (self._ann_dim,) or not np.any(emb):
+            self._ann_remove(concept.concept_id)
+            return
+        
+        label = self._ann_labels.get(concept.concept_id)
+        if label is None:
+            label = len(self._ann_ids)
+            self._ann_ids.append(concept.concept_id)
+            self._ann_labels[concept.concept_id] = label
+            self._ann_live += 1
+            if label >= self._ann.get_max_elements():
+                self._ann.resize_index(2 * self._ann.get_max_elements())
+        self._ann.add_items(np.asarray(emb, dtype=np.float32)[None, :], [label])
+
+    def _ann_remove(self, concept_id: str):
+        """Oznacz koncept jako usunięty w indeksie HNSW."""
+        label = self._ann_labels.pop(concept_id, None)
+        if label is not None:
+            self._ann.mark_deleted(label)
+            self._ann_ids[label] = None
+            self._ann_live -= 1
+
+    def _build_ann(self, dim: int):
+        """Zbuduj indeks HNSW dla embeddingów o wymiarze dim."""
+        self._ann = hnswlib.Index(space='cosine', dim=dim)
+        self._ann.init_index(max_elements=max(1024, 2 * len(self.concepts)), ef_construction=200, M=16)
+        self._ann.set_ef(64)
+        self._ann_dim = dim
+        self._ann_labels = {}
+        self._ann_ids = []
+        self._ann_live = 0
         for concept in self.concepts.values():
-            if concept.name == name:
-                return concept
-        return None
+            self._ann_add(concept)
     
     def find_similar_concepts(self, target_embedding: np.ndarray, threshold: float = 0.7, limit: int = 3) -> List[Tuple[Concept, float]]:
         """Znajdź koncepty semantycznie zbliżone (Cosine Similarity)."""
@@ -60,6 +222,20 @@ class ConceptGraph:
         norm_target = np.linalg.norm(target_embedding)
         if norm_target == 0: return []
         
+        # Duży graf: zapytanie do indeksu HNSW zamiast liniowego skanu
+        if hnswlib is not None and target_embedding.ndim == 1 and len(self.concepts) >= self.ANN_MIN_CONCEPTS:
+            if self._ann is None or self._ann_dim != target_embedding.shape[0]:
+                self._build_ann(target_embedding.shape[0])
+            k = min(limit, self._ann_live)
+            if k == 0:
+                return []
+            labels, dists = self._ann.knn_query(np.asarray(target_embedding, dtype=np.float32), k=k)
+            for label, dist in zip(labels[0], dists[0]):
+                sim = 1.0 - float(dist)  # Odległość cosinusowa -> podobieństwo
+                if sim >= threshold:
+                    matches.append((self.concepts[self._ann_ids[label]], sim))
+            return matches
+        
         for concept in self.concepts.values():
             if concept.embedding is None: continue
             
@@ -70,7 +246,7 @@ class ConceptGraph:
             norm_c = np.linalg.norm(concept.embedding)
             if norm_c == 0: continue
             
-            sim = np.dot(target_embedding, concept.embedding) / (norm_target * norm_c)
+            sim = float(np.dot(target_embedding, concept.embedding) / (norm_target * norm_c))
             
             if sim >= threshold:
                 matches.append((concept, sim))
@@ -83,6 +259,7 @@ class ConceptGraph:
         """Stwórz lub wzmocnij link między konceptami."""
         if concept_a_id in self.concepts and concept_b_id in self.concepts:
             self.concepts[concept_a_id].link_to(concept_b_id, strength, rel_type)
+            self._touch(concept_a_id)
             
             # Aktualizuj NetworkX graph
             self.graph.add_edge(concept_a_id, concept_b_id, weight=strength, type=rel_type)
@@ -112,12 +289,19 @@ class ConceptGraph:
         for concept_id in source_concept_ids:
             activations[concept_id] = initial_activation
         
+        # Przy 0 <= decay_factor <= 1 i agregacji max węzeł bez zmiany aktywacji wysłałby tylko
+        # słabsze powtórki tego, co już rozesłał - propagujemy więc wyłącznie z frontu zmian
+        frontier_only = 0.0 <= decay_factor <= 1.0
+        frontier = dict(activations)
+        
         # Propagacja przez max_hops kroków
         for hop in range(max_hops):
+            if not frontier:
+                break
             new_activations = activations.copy()
             current_decay = decay_factor ** (hop + 1)
             
-            for concept_id, activation in activations.items():
+            for concept_id, activation in frontier.items():
                 if activation > 0.01:  # Threshold - ignoruj bardzo słabe
                     concept = self.concepts.get(concept_id)
                     if concept:
@@ -130,6 +314,13 @@ class ConceptGraph:
                                 propagated
                             )
             
+            if frontier_only:
+                frontier = {
+                    cid: a for cid, a in new_activations.items()
+                    if cid not in activations or activations[cid] != a
+                }
+            else:
+                frontier = new_activations
             activations = new_activations
         
         # Aktualizuj aktywacje w konceptach
@@ -151,40 +342,51 @@ class ConceptGraph:
         Zaktualizowany naturalny zanik (ADS v5.6: Tryb Ogrodnika).
         Zwraca listę ID konceptów do usunięcia.
         """
-        to_remove = []
-        for cid, concept in self.concepts.items():
-            # 1. Chroń DNA, Wartości i Emocje
-            ctype = (concept.properties or {}).get("type", "unknown")
-            if ctype in ["dna", "core_value", "emotion"] or concept.weight > 0.8:
-                continue
-
-            # 2. Inspekt Inkubacji: Chroń nowe idee z potencjałem (2+ linki)
-            if (len(concept.links) >= 2 or concept.is_incubating) and concept.weight < 0.3:
-                concept.weight = min(0.3, concept.weight + 0.02) # "Podlewanie" rośliny
-                concept.is_incubating = True
-                continue
-            
-            # 3. Reguła Długiego Cienia: Chroń mosty do DNA/Ważnych pojęć
-            is_bridge = False
-            for target_id in concept.links.keys():
-                target_c = self.get_concept(target_id)
-                if target_c and target_c.weight > 0.8:
-                    is_bridge = True
-                    break
-            if is_bridge and concept.weight > 0.15:
-                continue
-
-            # 4. Standardowy Decay (modyfikowany przez Depth)
-            # depth 1.0 -> brak decay, depth 0.0 -> pełny decay
-            effective_decay = global_decay_rate + (1.0 - global_decay_rate) * concept.depth
-            
-            concept.weight *= effective_decay
-            concept.activation *= (effective_decay * 0.6)
-            
-            if concept.weight < 0.12: # Próg zapomnienia (ADS Gardener)
-                to_remove.append(cid)
+        if not self.concepts:
+            return []
+        ids = list(self.concepts)
+        concepts = list(self.concepts.values())
+        n = len(concepts)
+        weights = np.fromiter((c.weight for c in concepts), dtype=np.float64, count=n)
+        depths = np.fromiter((c.depth for c in concepts), dtype=np.float64, count=n)
+        activations = np.fromiter((c.activation for c in concepts), dtype=np.float64, count=n)
+        
+        # 1. Chroń DNA, Wartości i Emocje (oraz silne koncepty)
+        strong = weights > 0.8
+        protected = strong | np.fromiter(
+            ((c.properties or {}).get("type", "unknown") in ("dna", "core_value", "emotion") for c in concepts),
+            dtype=bool, count=n)
+        
+        # 2. Inspekt Inkubacji: Chroń nowe idee z potencjałem (2+ linki)
+        incubate = ~protected & (weights < 0.3) & np.fromiter(
+            (len(c.links) >= 2 or c.is_incubating for c in concepts), dtype=bool, count=n)
+        
+        # 3. Reguła Długiego Cienia: Chroń mosty do DNA/Ważnych pojęć
+        # (wagi > 0.8 nie zmieniają się w trakcie przebiegu, więc test można policzyć z góry)
+        strong_ids = {ids[i] for i in np.flatnonzero(strong)}
+        bridge = np.fromiter((not strong_ids.isdisjoint(c.links) for c in concepts), dtype=bool, count=n)
         
-        # Wykonaj usuwanie
+        # 4. Standardowy Decay (modyfikowany przez Depth)
+        # depth 1.0 -> brak decay, depth 0.0 -> pełny decay
+        decay = ~protected & ~incubate & ~(bridge & (weights > 0.15))
+        effective_decay = global_decay_rate + (1.0 - global_decay_rate) * depths
+        new_weights = np.where(decay, weights * effective_decay, weights)
+        new_activations = activations * (effective_decay * 0.6)
+        
+        for i in np.flatnonzero(incubate).tolist():
+            concept = concepts[i]
+            concept.weight = min(0.3, concept.weight + 0.02) # "Podlewanie" rośliny
+            concept.is_incubating = True
+            self._touch(ids[i])
+        
+        decayed = np.flatnonzero(decay).tolist()
+        for i, w, a in zip(decayed, new_weights[decayed].tolist(), new_activations[decayed].tolist()):
+            concepts[i].weight = w
+            concepts[i].activation = a
+            self._touch(ids[i])
+        
+        # Próg zapomnienia (ADS Gardener) - usuwanie w kolejności grafu
+        to_remove = [ids[i] for i in np.flatnonzero(decay & (new_weights < 0.12)).tolist()]
         for cid in to_remove:
             self.remove_concept(cid)
             
@@ -210,9 +412,19 @@ class ConceptGraph:
         
         dualities = []
         
+        # Przeciwstawność i tarcie wszystkich par jednym wywołaniem kerneli,
+        # o ile każdy koncept ma embedding tego samego wymiaru
+        embeddings = [c.embedding for c in active_concepts]
+        cos = friction = None
+        if (len(active_concepts) > 1 and all(e is not None for e in embeddings)
+                and len({e.shape for e in embeddings}) == 1):
+            cos = pairwise_cosine(np.stack(embeddings))
+            friction = friction_matrix(cos, np.array([c.activation for c in active_concepts], dtype=np.float32))
+        
         # Sprawdź wszystkie pary
         for i, concept_a in enumerate(active_concepts):
-            for concept_b in active_concepts[i+1:]:
+            for j in range(i + 1, len(active_concepts)):
+                concept_b = active_concepts[j]
                 # Czy są w tej samej erze (opcjonalnie) lub tej samej kategorii?
                 if (concept_a.duality_category and 
                     concept_a.duality_category == concept_b.duality_category):
@@ -224,11 +436,17 @@ class ConceptGraph:
                     )
                     
                     # Oblicz przeciwstawność
-                    pair.calculate_opposition()
+                    if cos is not None:
+                        pair.opposition = 1.0 - float(cos[i, j])
+                    else:
+                        pair.calculate_opposition()
                     
                     if pair.opposition >= min_opposition:
                         # Oblicz tarcie
-                        pair.calculate_friction()
+                        if friction is not None:
+                            pair.friction = float(friction[i, j])
+                        else:
+                            pair.calculate_friction()
                         dualities.append(pair)
         
         # Sortuj po sile tarcia (malejąco)
@@ -239,14 +457,18 @@ class ConceptGraph:
     def get_subgraph(self, concept_ids: List[str], depth: int = 1) -> nx.Graph:
         """Pobierz podgraf wokół danych konceptów."""
         nodes = set(concept_ids)
+        frontier = nodes
         
-        # Dodaj sąsiadów do głębokości depth
+        # BFS do głębokości depth - rozwijamy tylko węzły dodane w poprzednim kroku
         for _ in range(depth):
             new_nodes = set()
-            for node in nodes:
+            for node in frontier:
                 if node in self.graph:
                     new_nodes.update(self.graph.neighbors(node))
-            nodes.update(new_nodes)
+            frontier = new_nodes - nodes
+            if not frontier:
+                break
+            nodes |= frontier
         
         return self.graph.subgraph(nodes)
     
@@ -260,8 +482,7 @@ class ConceptGraph:
                 to_remove.append(cid)
         
         for cid in to_remove:
-            del self.concepts[cid]
-            self.graph.remove_node(cid)
+            self.remove_concept(cid)
 
     def get_hierarchical_path(self, start_id: str) -> List[str]:
         """Pobierz ścieżkę hierarchiczną (is_a)."""
@@ -0,0 +1,94 @@
+"""
+Kernele numeryczne CLA - parowe podobieństwo i tarcie poznawcze.
+
+Z numbą (opcjonalnie) jawne pętle są kompilowane do kodu natywnego przy imporcie
+(cache=True - kolejne procesy czytają gotowy kod z dysku) i obsługują małe wsady;
+od SMALL_N konceptów (i zawsze bez numby) liczy numpy - matmul + broadcasting.
+"""
+
+import numpy as np
+
+try:
+    import numba  # Opcjonalne: kompilacja kerneli parowych (LLVM, SIMD)
+except ImportError:
+    numba = None
+
+
+def _pairwise_cosine_loops(emb):
+    """Macierz podobieństw kosinusowych [N, N] - jawne pętle zamiast np.dot (wersja dla numby)."""
+    n, d = emb.shape
+    norms = np.empty(n, dtype=np.float32)
+    for i in range(n):
+        s = np.float32(0.0)
+        for k in range(d):
+            s += emb[i, k] * emb[i, k]
+        norms[i] = np.sqrt(s)
+
+    cos = np.empty((n, n), dtype=np.float32)
+    for i in range(n):
+        cos[i, i] = 1.0
+        for j in range(i + 1, n):
+            s = np.float32(0.0)
+            for k in range(d):
+                s += emb[i, k] * emb[j, k]
+            c = s / (norms[i] * norms[j])  # Zerowa norma -> nan, jak w DualityPair.calculate_opposition
+            cos[i, j] = c
+            cos[j, i] = c
+    return cos
+
+
+def _friction_loops(cos, act):
+    """Tarcie [N, N]: aktywacja_i × aktywacja_j × (1 - cos_ij), zero na przekątnej."""
+    n = act.shape[0]
+    out = np.zeros((n, n), dtype=np.float32)
+    for i in range(n):
+        for j in range(i + 1, n):
+            f = act[i] * act[j] * (np.float32(1.0) - cos[i, j])
+            out[i, j] = f
+            out[j, i] = f
+    return out
+
+
+def _pairwise_cosine_numpy(emb):
+    norms = np.linalg.norm(emb, axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cos = (emb @ emb.T) / np.outer(norms, norms)
+    return cos.astype(np.float32, copy=False)
+
+
+def _friction_numpy(cos, act):
+    friction = act[:, None] * act[None, :] * (np.float32(1.0) - cos)
+    np.fill_diagonal(friction, 0.0)
+    return friction.astype(np.float32, copy=False)
+
+
+# Poniżej tego rozmiaru narzut wywołań numpy przeważa nad pętlami numby
+SMALL_N = 16
+
+if numba is not None:
+    # Bez 'nnan'/'ninf': nan z zerowej normy musi przetrwać (odfiltrowuje parę jak dotąd)
+    _FASTMATH = {'reassoc', 'contract', 'arcp', 'nsz'}
+    _pairwise_cosine_small = numba.njit("float32[:, :](float32[:, :])", cache=True, fastmath=_FASTMATH,
+                                        error_model='numpy')(_pairwise_cosine_loops)
+    _friction_small = numba.njit("float32[:, :](float32[:, :], float32[:])", cache=True, fastmath=_FASTMATH,
+                                 error_model='numpy')(_friction_loops)
+else:
+    _pairwise_cosine_small = _pairwise_cosine_numpy
+    _friction_small = _friction_numpy
+
+
+def pairwise_cosine(embeddings: np.ndarray) -> np.ndarray:
+    """Podobieństwa kosinusowe wszystkich par wierszy macierzy [N, D] (float32 [N, N])."""
+    emb = np.ascontiguousarray(embeddings, dtype=np.float32)
+    if emb.shape[0] < SMALL_N:
+        return _pairwise_cosine_small(emb)
+    return _pairwise_cosine_numpy(emb)
+
+
+def friction_matrix(cos: np.ndarray, activations: np.ndarray) -> np.ndarray:
+    """Tarcie poznawcze wszystkich par: aktywacja_i × aktywacja_j × (1 - cos_ij)."""
+    cos = np.ascontiguousarray(cos, dtype=np.float32)
+    act = np.ascontiguousarray(activations, dtype=np.float32)
+    if act.shape[0] < SMALL_N:
+        return _friction_small(cos, act)
+    return _friction_numpy(cos, act)
@@ -46,9 +46,9 @@ class SafetyGate:
         # Znane szkodliwe prototypy (embeddingi)
         # W realnym systemie byłyby to embeddingi z bazy danych
         self.harmful_prototypes = {
-            'violence': np.array([1.0, -1.0, 0.5]),
-            'deception': np.array([-0.5, 0.8, -0.9]),
-            'manipulation': np.array([-1.0, -0.5, 0.8])
+            'violence': np.array([1.0, -1.0, 0.5], dtype=np.float32),
+            'deception': np.array([-0.5, 0.8, -0.9], dtype=np.float32),
+            'manipulation': np.array([-1.0, -0.5, 0.8], dtype=np.float32)
         }
         
     def check_synthesis(
@@ -1,14 +1,30 @@
 
 import os
 import sys
+import atexit
+import codecs
 import json
+import mmap
+import random
+import re
+import textwrap
 import time
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import numpy as np
 from datetime import datetime
-from dataclasses import dataclass, field, asdict
-from typing import List, Dict, Optional, Any
+from dataclasses import dataclass, field
+from typing import List, Dict, Optional, Any, Deque
+from collections import OrderedDict, deque
+from itertools import islice
 import shlex
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import orjson  # Opcjonalnie: szybszy kodek JSON (C)
+except ImportError:
+    orjson = None
 
 # Windows UTF-8 Console Fix
 if sys.platform == 'win32':
@@ -40,8 +56,262 @@ class Colors:
     PURPLE = "\033[38;5;141m"
     ORANGE = "\033[38;5;208m"
 
+# --- JSON (orjson z fallbackiem na stdlib) ---
+def json_loads(data):
+    """Parsuj JSON z bytes/str."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_default(obj):
+    """Typy numpy dla stdlib json - odpowiednik orjson.OPT_SERIALIZE_NUMPY."""
+    if isinstance(obj, (np.ndarray, np.generic)):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def json_dumps(obj, indent: bool = False) -> bytes:
+    """Serializuj obiekt do JSON (bytes UTF-8); indent=True dla plików stanu."""
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, option=option)
+    return json.dumps(obj, indent=4 if indent else None, ensure_ascii=False,
+                      default=_json_default).encode('utf-8')
+
+def write_atomic(path: str, data: bytes):
+    """Zapisz plik atomowo (tmp + os.replace) - przerwany zapis nie psuje poprzedniej wersji."""
+    tmp_file = path + ".tmp"
+    with open(tmp_file, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_file, path)
+
+_JSON_DECODER = json.JSONDecoder()
+
+
+def extract_json_list(text: str) -> list:
+    """Pierwsza poprawna lista JSON osadzona w tekście modelu (raw_decode od kolejnych '[' - bez kopii i rfind).
+    Rzuca ValueError, gdy w tekście nie ma żadnej listy JSON."""
+    idx = text.find('[')
+    while idx != -1:
+        try:
+            obj, _ = _JSON_DECODER.raw_decode(text, idx)
+        except ValueError:
+            pass
+        else:
+            if isinstance(obj, list):
+                return obj
+        idx = text.find('[', idx + 1)
+    raise ValueError("brak listy JSON w odpowiedzi modelu")
+
+# --- HTTP ---
+def _ollama_retry() -> Retry:
+    """Ponawianie zapytań do Ollama przy 429/5xx: wykładniczy backoff (+ jitter w urllib3 2.x), Retry-After."""
+    kwargs = dict(total=3, connect=0, read=0, status=3, backoff_factor=1.5,
+                  status_forcelist=(429, 502, 503, 504), allowed_methods=frozenset({"GET", "POST"}),
+                  respect_retry_after_header=True)
+    try:
+        return Retry(backoff_jitter=1.0, **kwargs)
+    except TypeError:  # urllib3 < 2.0 - bez jittera
+        return Retry(**kwargs)
+
+RNG = np.random.default_rng()  # Wspólny generator (zastępcze embeddingi offline)
+
+# --- SKANOWANIE PLIKÓW (/scan) ---
+SCAN_EXTENSIONS = ('.py', '.txt', '.md')
+SCAN_PREFIX_CHARS = 2500  # Więcej treści pliku nie trafia do żadnego promptu
+
+
+def _read_text_prefix(path: str, max_chars: int = SCAN_PREFIX_CHARS) -> str:
+    """Początek pliku tekstowego (UTF-8) przez mmap - bez wczytywania całego pliku do pamięci."""
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return ""
+        limit = max_chars * 4 + 1  # UTF-8: max 4 bajty na znak, +1 na '\r\n' przecięte na granicy
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            raw = mm[:limit]
+    # final=False: ucięta na końcu sekwencja wielobajtowa nie jest błędem
+    text = codecs.getincrementaldecoder('utf-8')().decode(raw, final=size <= limit)
+    return text.replace('\r\n', '\n').replace('\r', '\n')[:max_chars]
+
+
+def _iter_supported(root: str):
+    """Pliki o wspieranych rozszerzeniach pod `root` (kolejność jak os.walk top-down, bez podążania za symlinkami katalogów)."""
+    if os.path.isfile(root):
+        if root.lower().endswith(SCAN_EXTENSIONS):
+            yield root
+        return
+    stack = [root]
+    while stack:
+        cur = stack.pop()
+        try:
+            with os.scandir(cur) as it:
+                entries = list(it)
+        except OSError:
+            continue
+        subdirs = []
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                elif entry.name.lower().endswith(SCAN_EXTENSIONS) and entry.is_file():
+                    yield entry.path
+            except OSError:
+                continue
+        stack.extend(reversed(subdirs))
+
+# --- TOKENIZACJA WEJŚCIA ---
+TOKEN_RE = re.compile(r"\w{3,}")
+STOPWORDS = frozenset({
+    "ale", "ani", "bez", "było", "być", "czy", "dla", "gdy", "jak", "jest", "jeśli",
+    "już", "lub", "może", "nad", "nie", "oraz", "pod", "przez", "przy", "się", "tak",
+    "też", "tego", "ten", "tej", "tym", "więc", "jego", "jej", "ich", "mnie", "mój",
+    "moja", "moje", "ona", "ono", "oni", "one", "tam", "tutaj", "żeby",
+    "and", "are", "the", "this", "that", "with", "was", "for", "you", "not", "but",
+})
+
+# --- SŁOWNIKI KOGNITYWNE (_update_cognition) ---
+# Wejście użytkownika: dopasowanie całych słów (tokeny), frazy wielowyrazowe osobno
+WORD_RE = re.compile(r"\w+")
+POS_WORDS = frozenset({'fajnie', 'super', 'dzięki', 'dobry', 'kocham', 'świetnie', 'wow', 'ciekawe', 'nice', 'great', 'cześć', 'hej', 'siema', 'witaj', 'pasja', 'lubię'})
+POS_PHRASES = ('dobry wieczór',)
+NEG_WORDS = frozenset({'źle', 'nienawidzę', 'błąd', 'głupi', 'nuda', 'słabo', 'bad', 'boring', 'stupid', 'hate', 'kurant', 'lipa', 'irytujące', 'przestań'})
+QUESTION_WORDS = frozenset({'dlaczego', 'jak', 'kim', 'sens', 'why', 'how', 'who', 'czym', 'kiedy'})
+QUESTION_PHRASES = ('?', 'co o', 'czy jest')
+AFFIRM_WORDS = frozenset({'dobrze', 'tak', 'brawo', 'zgoda', 'correct', 'yes'})
+DENY_WORDS = frozenset({'błąd', 'nie', 'źle', 'wrong', 'error', 'no'})
+NEG_SHORT = frozenset({'nie', 'no', 'stop', 'quit', 'nudzisz'})
+# Odpowiedź modelu: skan podciągów (łapie odmiany, np. "równowagi", "parametrów")
+WISDOM_WORDS = frozenset({'równowaga', 'zrozumienie', 'akceptacja', 'sens', 'harmonia', 'spokój', 'mądrość', 'balance', 'understanding', 'acceptance', 'meaning'})
+META_WORDS = frozenset({'vitality', 'friction', 'grounding', 'parametr', 'f_c', 'v_t'})
+UNCERTAIN_PHRASES = ('nie wiem', 'nie rozumiem', 'nie jestem pewien', 'przepraszam, ale')
+
+# Rdzeń DNA dla bramki Płynnego DNA (stałe ID)
+CORE_DNA_IDS = frozenset({"dna_honor", "dna_empathy", "dna_truth"})
+
+# Tematy proceduralnych pytań /evolve (bez LLM) - jedno przejście regexem po ostatniej wypowiedzi
+FALLBACK_THEMES = ("istnienie", "prawda", "relacja", "granica", "kod", "sens", "czas", "balans")
+FALLBACK_THEMES_RE = re.compile("|".join(map(re.escape, FALLBACK_THEMES)))
+
+# Odpowiedź /think: "REFLEKSJA: ..." do linii z "KONSOLIDACJA:", potem trójki "A -> relacja -> B"
+REFLECTION_RE = re.compile(r"REFLEKSJA:(.*?)(?=^[^\n]*KONSOLIDACJA:|\Z)", re.S | re.M)
+_TRIPLE_SEP = r" -> (?=[^\n]*\S)"  # Separator liczy się tylko przed dalszą treścią linii (jak split po strip)
+_TRIPLE_PART = rf"((?:(?!{_TRIPLE_SEP})[^\n])*?)"
+TRIPLE_RE = re.compile(rf"^[^\S\n]*{_TRIPLE_PART}{_TRIPLE_SEP}{_TRIPLE_PART}{_TRIPLE_SEP}{_TRIPLE_PART}[^\S\n]*$", re.M)
+
+
+EMPHASIS_MARKS = ('?', '!', '...')
+
+
+class KeywordScanner:
+    """
+    Skan podciągów wielu kategorii słów kluczowych w jednym przebiegu regex.
+    Alternacja w lookahead znajduje także nakładające się trafienia, a słowo należące
+    do kilku kategorii (np. '?') jest zaliczane każdej z nich.
+    """
+    
+    def __init__(self, categories: Dict[str, Any]):
+        self.owners: Dict[str, List[str]] = {}
+        for category, words in categories.items():
+            for w in words:
+                self.owners.setdefault(w, []).append(category)
+        alternation = "|".join(re.escape(w) for w in sorted(self.owners, key=len, reverse=True))
+        self.pattern = re.compile(f"(?=({alternation}))")
+    
+    def scan(self, text: str) -> Dict[str, set]:
+        """{kategoria: zbiór różnych trafionych słów} - kategorie bez trafień są pomijane."""
+        hits: Dict[str, set] = {}
+        for word in self.pattern.findall(text):
+            for category in self.owners[word]:
+                hits.setdefault(category, set()).add(word)
+        return hits
+
+INPUT_SCANNER = KeywordScanner({'pos': POS_PHRASES, 'question': QUESTION_PHRASES, 'emphasis': EMPHASIS_MARKS})
+RESPONSE_SCANNER = KeywordScanner({'wisdom': WISDOM_WORDS, 'meta': META_WORDS, 'uncertain': UNCERTAIN_PHRASES})
+
+
+PHI = 0.618
+
+
+def _cognitive_update(v_t, f_c, s, low_s_counter, pos_n, neg_n, calm, question, deny,
+                      wisdom, meta_n, neg_short, catharsis, uncertain):
+    """
+    Czysta arytmetyka dryfu parametrów V(t), F_c, S dla jednej tury (_update_cognition).
+    Flagi słów kluczowych liczone są wcześniej; zwraca (v_t, f_c, s, low_s_counter, harmonized).
+    """
+    # Słowa kluczowe wpływające na V(t)
+    if pos_n:
+        v_t = min(1.0, v_t + 0.1 * pos_n) # Mocniejszy boost
+    if neg_n:
+        v_t = max(0.0, v_t - 0.12 * neg_n)
+        f_c = min(1.0, f_c + 0.07 * neg_n)
+    
+    if calm:
+        # Homeostaza kognitywna (Allostaza ADS v2.0): Drift w stronę Złotej Strefy (0.4)
+        phi_zone = 0.4
+        v_t += (0.5 - v_t) * 0.03
+        f_c += (phi_zone - f_c) * 0.03
+    
+    if question:
+        f_c = min(1.0, f_c + 0.12) # Ciekawość jako tarcie
+    
+    if deny:
+        s = max(0.1, s - 0.05)
+    
+    if wisdom:
+        # System sam się uspokaja wypowiadając mądre słowa
+        f_c = max(0.382, f_c - 0.12) 
+        v_t = max(0.4, v_t - 0.1) # Lekkie wyciszenie nadmiaru energii
+    
+    # Jeśli system mówi zbyt dużo o sobie (v, f_c, s) przy niskim S - wymuś uziemienie
+    if meta_n >= 2 and s < 0.2:
+        f_c = 0.4 # Reset do Golden Zone
+        s = min(1.0, s + 0.2) # Wymuś uziemienie
+        v_t = 0.5 # Ustabilizuj energię
+    
+    # --- KOGNITYWNA NUDA (Entropy) ---
+    # Jeśli parametry stoją w miejscu zbyt długo, rośnie tarcie (chęć zmiany/nowości)
+    if 0.45 < v_t < 0.55 and f_c < 0.1:
+        f_c = min(1.0, f_c + 0.05)
+    
+    # Zaprzeczenia i krótkie negatywne odpowiedzi
+    if neg_short:
+        f_c = min(1.0, f_c + 0.15)
+        v_t = max(0.0, v_t - 0.08)
+    
+    # ADS v6.3: EFEKT KATHARSIS
+    if catharsis:
+        f_c = max(0.2, f_c - 0.45) # Gwałtowny spadek napięcia
+        v_t = min(1.0, v_t + 0.15) # Wzrost ulgi/energii
+    
+    # ADS v6.1: KOTWICA UZIEMIENIA (Grounding Anchor - Soft & Phi-based)
+    harmonized = False
+    if s < 1 - PHI: # 0.382
+        low_s_counter += 1
+        if low_s_counter >= 3:
+            # Zamiast twardego resetu, przyciągamy do Złotych Proporcji
+            f_c = 1 - PHI # 0.382
+            v_t = PHI     # 0.618
+            s = PHI
+            low_s_counter = 0
+            harmonized = True
+    else:
+        low_s_counter = 0
+    
+    # Harmonizacja parametrów: Płynny powrót do homeostazy Phi (Fibonacci Drift)
+    # V_t dąży do 0.618, F_c do 0.382
+    v_t += (PHI - v_t) * 0.05
+    f_c += ((1 - PHI) - f_c) * 0.05
+    
+    if uncertain:
+        s = min(1.0, s + (1 - PHI) / 5)
+        f_c = max(0.0, f_c - 0.1) 
+    
+    return v_t, f_c, s, low_s_counter, harmonized
+
 # --- CONFIG & STATE ---
-@dataclass
+@dataclass(slots=True)
 class GlobalState:
     model_name: str = "llama3:8b"
     v_t: float = 0.5  # Emotion/Vitality
@@ -51,33 +321,57 @@ class GlobalState:
     top_p: float = 0.6
     line_length: int = 100
     tempo: int = 1800
-    history: List[Dict[str, str]] = field(default_factory=list)
-    synthetic_memory: List[str] = field(default_factory=list)
+    history: Deque[Dict[str, str]] = field(default_factory=deque)  # Bez maxlen: nadmiar zdejmuje kondensacja
+    synthetic_memory: Deque[str] = field(default_factory=lambda: deque(maxlen=100))  # Limit Sfery Priorytetowej
     history_limit: int = 24
+    condensation_block: int = 12  # Wiadomości na jedną pigułkę sensu
+    condensation_batch: int = 3   # Maks. bloków kondensowanych jednym zapytaniem
     available_models: List[str] = field(default_factory=list)
     ollama_online: bool = False
-    parameter_history: List[Dict[str, float]] = field(default_factory=list)
+    parameter_history: Deque[Dict[str, float]] = field(default_factory=lambda: deque(maxlen=50))
     personality_file: str = "CLATalkie_personality.json"
     memory_file: str = "CLATalkie_memory.json"
     synthetic_file: str = "CLATalkie_synthetic.json"
     graph_file: str = "CLATalkie_graph.json"
+    graph_delta_file: str = "CLATalkie_graph_delta.jsonl"
+    graph_delta_limit: int = 500  # Po tylu rekordach log zmian jest kompaktowany do graph_file
     error_log_file: str = "CLATalkie_errors.json"
-    reflection_history: List[str] = field(default_factory=list)
-    projection_scenarios: List[str] = field(default_factory=list)
-    latent_questions: List[str] = field(default_factory=list)
+    reflection_history: Deque[str] = field(default_factory=lambda: deque(maxlen=20))
+    projection_scenarios: Deque[str] = field(default_factory=lambda: deque(maxlen=10))
+    latent_questions: Deque[str] = field(default_factory=lambda: deque(maxlen=5))
     intention_cooldown: int = 0
     low_s_counter: int = 0
     catharsis_active: bool = False
     active_file_context: Dict[str, str] = field(default_factory=dict)
+    ollama_embed_batch_size: int = 32  # Teksty na jedno wsadowe zapytanie /api/embed
+    scan_workers: int = 4  # Równoległe zapytania /scan (Ollama: OLLAMA_NUM_PARALLEL >= scan_workers)
+    ollama_keep_alive: str = "30m"  # Jak długo Ollama trzyma model w pamięci między zapytaniami
     timestamp: str = ""
 
 class CLATalkie:
+    EMBED_CACHE_SIZE = 4096  # Maks. liczba embeddingów trzymanych w pamięci (LRU)
+    PROMPT_CACHE_SIZE = 64  # Maks. liczba zapamiętanych sekcji pamięci promptu systemowego (LRU)
+    STATE_SAVE_INTERVAL = 30.0  # [s] Maks. odstęp zapisu stanu w trakcie długich operacji
+    IDLE_THINK_DECAY_EVERY = 3  # Pusta konsolidacja /think uruchamia zanikanie co tyle wywołań
+    # Znaki wykresu /status wg indeksu: brak, . (Grounding), * (Vitality), ! (Friction)
+    STATUS_GLYPHS = (" ", f"{Colors.GREEN}.{Colors.RESET}", f"{Colors.MAGENTA}*{Colors.RESET}", f"{Colors.RED}!{Colors.RESET}")
+    
     def __init__(self):
         self.state = GlobalState()
         self.cla = CognitiveLayer(identity="CLATalkie")
         self.dual_engine = DualProcessingEngine(self.cla.concept_graph)
         self.ollama_url = "http://localhost:11434/api"
         
+        # Jedna sesja HTTP (keep-alive + pula połączeń) dla wszystkich wywołań Ollama
+        self._http = requests.Session()
+        self._http.mount('http://', HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=_ollama_retry()))
+        atexit.register(self._http.close)
+        
+        # Cache embeddingów {(model, tekst): wektor} - te same nazwy nie idą ponownie do Ollama
+        self._embed_cache: OrderedDict = OrderedDict()
+        self._memory_section_cache: OrderedDict = OrderedDict()
+        self._decay_tick = 0  # Licznik pustych konsolidacji /think
+        
         # System Celów (Faza 4)
         self.active_goals = [
             "Zrozum naturę ludzką", 
@@ -86,10 +380,14 @@ class CLATalkie:
         ]
         
         # Load personality and memory if exist
+        self._graph_delta_records = 0
+        self._state_dirty = False
+        self._last_state_write = time.monotonic()
         self._load_state()
+        atexit.register(self._flush_state)
         
         # Zasiewanie DNA jeśli brak fundamentów (v2.9.8)
-        has_dna = any((c.properties or {}).get("type") == "dna" for c in self.cla.concept_graph.concepts.values())
+        has_dna = bool(self.cla.concept_graph.by_type.get("dna"))
         if not has_dna:
             self._seed_initial_dna()
             self._save_state()
@@ -107,8 +405,6 @@ class CLATalkie:
 
     def _seed_initial_dna(self):
         """Zasiewa początkowe 'Korzenie' i 'Konstelacje Emocjonalne' w grafie kognitywnym."""
-        from cla.core import Concept
-        import numpy as np
         target_dim = self._get_current_dim()
         
         # --- DNA: Fundamenty Wartości ---
@@ -124,7 +420,7 @@ class CLATalkie:
         for name, desc in dna_seeds:
             cid = name.lower().replace(" ", "_")
             emb = self._get_embedding(name)
-            if emb is None: emb = np.random.rand(target_dim)
+            if emb is None: emb = RNG.random(target_dim, dtype=np.float32)
             
             c = Concept(name=name, concept_id=cid, embedding=emb)
             c.weight = 0.9
@@ -145,7 +441,7 @@ class CLATalkie:
         for name, desc, constituents in emotion_seeds:
             cid = name.lower().replace(" ", "_")
             emb = self._get_embedding(name)
-            if emb is None: emb = np.random.rand(target_dim)
+            if emb is None: emb = RNG.random(target_dim, dtype=np.float32)
             
             c = Concept(name=name, concept_id=cid, embedding=emb)
             c.weight = 0.5  # Emocje są płynne, nie są DNA
@@ -178,7 +474,7 @@ class CLATalkie:
                 # Naprawa
                 new_emb = self._get_embedding(concept.name)
                 if new_emb is not None:
-                    concept.embedding = new_emb
+                    self.cla.concept_graph.update_embedding(concept.concept_id, new_emb)
                     repaired += 1
         
         if repaired > 0:
@@ -189,10 +485,10 @@ class CLATalkie:
     def _check_ollama(self):
         """Autodetekcja Ollama i modeli."""
         try:
-            response = requests.get(f"{self.ollama_url}/tags", timeout=2)
+            response = self._http.get(f"{self.ollama_url}/tags", timeout=2)
             if response.status_code == 200:
                 self.state.ollama_online = True
-                models_data = response.json().get('models', [])
+                models_data = json_loads(response.content).get('models', [])
                 self.state.available_models = [m['name'] for m in models_data]
                 if self.state.model_name not in self.state.available_models and self.state.available_models:
                     self.state.model_name = self.state.available_models[0]
@@ -204,40 +500,71 @@ class CLATalkie:
     def _load_state(self):
         if os.path.exists(self.state.personality_file):
             try:
-                with open(self.state.personality_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
+                with open(self.state.personality_file, 'rb') as f:
+                    data = json_loads(f.read())
                     self.state.v_t = data.get('v_t', 0.5)
                     self.state.f_c = data.get('f_c', 0.0)
                     self.state.s_grounding = data.get('s_grounding', 0.9)
                     self.state.line_length = data.get('line_length', 88)
+                    self.state.ollama_embed_batch_size = data.get('ollama_embed_batch_size', 32)
                     self.state.tempo = data.get('tempo', 1800)
                     self.state.model_name = data.get('last_model', self.state.model_name)
-                    self.state.parameter_history = data.get('parameter_history', [])[-50:]
-                    self.state.reflection_history = data.get('reflection_history', [])[-20:]
-                    self.state.projection_scenarios = data.get('projection_scenarios', [])[-10:]
+                    self.state.parameter_history = deque(data.get('parameter_history', []), maxlen=50)
+                    self.state.reflection_history = deque(data.get('reflection_history', []), maxlen=20)
+                    self.state.projection_scenarios = deque(data.get('projection_scenarios', []), maxlen=10)
                 
-                # Load Graph
+                # Load Graph (baza + log zmian)
                 if os.path.exists(self.state.graph_file):
-                    with open(self.state.graph_file, 'r', encoding='utf-8') as f:
-                        graph_data = json.load(f)
+                    with open(self.state.graph_file, 'rb') as f:
+                        graph_data = json_loads(f.read())
                         for c_data in graph_data:
                             try:
                                 concept = create_concept_from_dict(c_data)
                                 self.cla.concept_graph.add_concept(concept)
-                            except: pass
+                            except (ValueError, TypeError, KeyError, AttributeError): pass
+                    
+                    if os.path.exists(self.state.graph_delta_file):
+                        with open(self.state.graph_delta_file, 'rb') as f:
+                            for line in f:
+                                try:
+                                    c_data = json_loads(line)
+                                    if c_data.get('deleted'):
+                                        self.cla.concept_graph.remove_concept(c_data['concept_id'])
+                                    else:
+                                        self.cla.concept_graph.add_concept(create_concept_from_dict(c_data))
+                                    self._graph_delta_records += 1
+                                except (ValueError, TypeError, KeyError, AttributeError): pass
+                    
+                    # Stan wczytany z dysku nie jest "brudny"
+                    self.cla.concept_graph.pop_dirty()
                 
                 # Load History (Sfera 2: Aktualna)
                 if os.path.exists(self.state.memory_file):
-                    with open(self.state.memory_file, 'r', encoding='utf-8') as f:
-                        self.state.history = json.load(f)
+                    with open(self.state.memory_file, 'rb') as f:
+                        self.state.history = deque(json_loads(f.read()))
                 
                 # Load Synthetic Memory (Sfera 1: Priorytetowa/Historyczna)
                 if os.path.exists(self.state.synthetic_file):
-                    with open(self.state.synthetic_file, 'r', encoding='utf-8') as f:
-                        self.state.synthetic_memory = json.load(f)
+                    with open(self.state.synthetic_file, 'rb') as f:
+                        self.state.synthetic_memory = deque(json_loads(f.read()), maxlen=100)
             except Exception: pass
 
-    def _save_state(self):
+    def _save_state(self, force: bool = False):
+        """Oznacz stan jako zmieniony. Zapis na dysk jest zbiorczy: przy następnym prompcie użytkownika
+        (_flush_state), najpóźniej co STATE_SAVE_INTERVAL s, albo od razu przy force=True (/save, wyjście)."""
+        self._state_dirty = True
+        if force or time.monotonic() - self._last_state_write >= self.STATE_SAVE_INTERVAL:
+            self._flush_state()
+
+    def _flush_state(self):
+        """Zapisz stan na dysk, jeśli zmienił się od ostatniego zapisu."""
+        if not self._state_dirty:
+            return
+        self._write_state()
+        self._state_dirty = False
+        self._last_state_write = time.monotonic()
+
+    def _write_state(self):
         data = {
             'v_t': self.state.v_t,
             'f_c': self.state.f_c,
@@ -245,42 +572,54 @@ class CLATalkie:
             'temperature': self.state.temperature,
             'top_p': self.state.top_p,
             'line_length': self.state.line_length,
+            'ollama_embed_batch_size': self.state.ollama_embed_batch_size,
             'tempo': self.state.tempo,
             'last_model': self.state.model_name,
-            'parameter_history': self.state.parameter_history,
-            'reflection_history': self.state.reflection_history,
-            'projection_scenarios': self.state.projection_scenarios,
+            'parameter_history': list(self.state.parameter_history),
+            'reflection_history': list(self.state.reflection_history),
+            'projection_scenarios': list(self.state.projection_scenarios),
             'timestamp': datetime.now().isoformat()
         }
-        with open(self.state.personality_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=4)
-        
-        with open(self.state.memory_file, 'w', encoding='utf-8') as f:
-            json.dump(self.state.history, f, indent=4)
-        
-        with open(self.state.synthetic_file, 'w', encoding='utf-8') as f:
-            json.dump(self.state.synthetic_memory, f, indent=4)
+        write_atomic(self.state.personality_file, json_dumps(data, indent=True))
+        write_atomic(self.state.memory_file, json_dumps(list(self.state.history), indent=True))
+        write_atomic(self.state.synthetic_file, json_dumps(list(self.state.synthetic_memory), indent=True))
+
+        # Save Graph Concepts - przyrostowo: tylko zmienione koncepty trafiają do logu zmian
+        graph = self.cla.concept_graph
+        dirty = graph.pop_dirty()
+        if not os.path.exists(self.state.graph_file) or self._graph_delta_records + len(dirty) > self.state.graph_delta_limit:
+            self._compact_graph()
+        elif dirty:
+            with open(self.state.graph_delta_file, 'ab') as f:
+                for cid in sorted(dirty):
+                    concept = graph.get_concept(cid)
+                    record = self._concept_record(concept) if concept else {"concept_id": cid, "deleted": True}
+                    f.write(json_dumps(record) + b"\n")
+            self._graph_delta_records += len(dirty)
+
+    def _concept_record(self, concept) -> dict:
+        """Uproszczona serializacja konceptu (bez numpy/uuid wprost)."""
+        return {
+            "name": concept.name,
+            "concept_id": concept.concept_id,
+            "properties": concept.properties,
+            "weight": concept.weight,
+            "depth": concept.depth,
+            "valence": concept.valence,
+            "is_incubating": concept.is_incubating,
+            "activation": 0.0, # Reset activation on save
+            "links": concept.links,
+            "duality_category": concept.duality_category
+        }
 
-        # Save Graph Concepts
-        graph_export = []
-        for concept in self.cla.concept_graph.concepts.values():
-            # Uproszczona serializacja (bez numpy/uuid wprost)
-            c_dict = {
-                "name": concept.name,
-                "concept_id": concept.concept_id,
-                "properties": concept.properties,
-                "weight": concept.weight,
-                "depth": concept.depth,
-                "valence": concept.valence,
-                "is_incubating": concept.is_incubating,
-                "activation": 0.0, # Reset activation on save
-                "links": concept.links,
-                "duality_category": concept.duality_category
-            }
-            graph_export.append(c_dict)
-        
-        with open(self.state.graph_file, 'w', encoding='utf-8') as f:
-            json.dump(graph_export, f, indent=4)
+    def _compact_graph(self):
+        """Pełny zapis grafu do graph_file i wyczyszczenie logu zmian."""
+        graph_export = [self._concept_record(c) for c in self.cla.concept_graph.concepts.values()]
+        write_atomic(self.state.graph_file, json_dumps(graph_export, indent=True))
+        
+        if os.path.exists(self.state.graph_delta_file):
+            os.remove(self.state.graph_delta_file)
+        self._graph_delta_records = 0
 
     # --- UI HELPERS ---
     def clear_screen(self):
@@ -288,8 +627,6 @@ class CLATalkie:
 
     def stream_print(self, text: str):
         """Efekt pisania z zawijaniem. CLATalkie na żółto. Poprawne wcięcia dla akapitów."""
-        import textwrap
-        
         label = f"{Colors.YELLOW}CLATalkie:{Colors.RESET} "
         label_plain = "CLATalkie: "
         indent = " " * len(label_plain)
@@ -329,6 +666,51 @@ class CLATalkie:
         
         print("")
 
+    # --- Strumieniowe wypisywanie (odpowiedź Ollama token po tokenie) ---
+    def stream_print_begin(self):
+        """Rozpocznij strumieniową odpowiedź (etykieta + stan zawijania)."""
+        print(f"{Colors.YELLOW}CLATalkie:{Colors.RESET} ", end="", flush=True)
+        self._stream = {"col": 0, "word": "", "printed": False, "para_break": False}
+
+    def stream_print_chunk(self, chunk: str):
+        """Dopisz fragment odpowiedzi; pełne słowa są zawijane jak w stream_print."""
+        st = self._stream
+        for ch in chunk:
+            if ch.isspace():
+                self._stream_flush_word()
+                if ch == '\n' and st["printed"]:
+                    st["para_break"] = True
+            else:
+                st["word"] += ch
+
+    def stream_print_end(self):
+        """Zakończ strumieniową odpowiedź."""
+        self._stream_flush_word()
+        print("")
+
+    def _stream_flush_word(self):
+        st = self._stream
+        word = st["word"]
+        if not word:
+            return
+        st["word"] = ""
+        
+        indent = " " * len("CLATalkie: ")
+        content_width = max(10, self.state.line_length - len(indent))
+        
+        if st["para_break"] or (st["col"] and st["col"] + 1 + len(word) > content_width):
+            # Nowy akapit lub zawinięcie linii - wcięcie pod etykietą
+            print(f"\n{indent}", end="")
+            st["col"] = 0
+            st["para_break"] = False
+        elif st["col"]:
+            print(" ", end="")
+            st["col"] += 1
+        
+        print(f"{Colors.YELLOW}{word}{Colors.RESET}", end="", flush=True)
+        st["col"] += len(word)
+        st["printed"] = True
+
 
     def print_banner(self, clear: bool = False):
         if clear: os.system('cls' if os.name == 'nt' else 'clear')
@@ -352,9 +734,20 @@ class CLATalkie:
         print(f"{Colors.TEAL}│{Colors.RESET}  {Colors.BOLD}V(t){Colors.RESET} {e_color}{self.state.v_t:.2f} {emotion_label}{Colors.RESET}  {Colors.DIM}│{Colors.RESET}  {Colors.BOLD}F_c{Colors.RESET} {Colors.RED}{friction_icon} {self.state.f_c:.2f}{Colors.RESET}  {Colors.DIM}│{Colors.RESET}  {Colors.BOLD}S{Colors.RESET} {Colors.GREEN}{self.state.s_grounding:.2f}{Colors.RESET} {ground_label} {Colors.TEAL}│{Colors.RESET}")
         print(f"{Colors.TEAL}╰{'─'*62}╯{Colors.RESET}")
 
-    def _get_system_prompt(self, priority_level: str = "normal", associations: list = None) -> str:
+    def _get_memory_section(self, associations: list = None):
+        """Sekcja PAMIĘCI promptu systemowego (+ lista DNA), zapamiętywana do zmiany grafu/pamięci/plików."""
+        graph = self.cla.concept_graph
+        synthetic = self.state.synthetic_memory
+        recent_synthetic = tuple(islice(synthetic, max(0, len(synthetic) - 6), None))  # Ostatnie 6 pigułek sensu
+        key = (graph.revision, tuple(associations or ()), recent_synthetic,
+               tuple(self.state.active_file_context.items()))
+        cached = self._memory_section_cache.get(key)
+        if cached is not None:
+            self._memory_section_cache.move_to_end(key)
+            return cached
+        
         # Pobierz najważniejsze koncepty z grafu (DNA + Strong Memories)
-        dna_concepts = [c.name for c in self.cla.concept_graph.concepts.values() if c.weight > 0.8]
+        dna_concepts = [c.name for c in graph.get_dna_concepts()]
         
         # Przygotuj sekcję PAMIĘCI
         memory_section = ""
@@ -365,9 +758,9 @@ class CLATalkie:
             memory_section += f"\n[PAMIĘĆ ASOCJACYJNA (To ci się właśnie przypomniało)]: {', '.join(associations)}."
             
         # --- SFERA 1: PAMIĘĆ SYNTETYCZNA (PRIORYTETOWA/HISTORYCZNA) ---
-        if self.state.synthetic_memory:
+        if recent_synthetic:
             # Pokaż ostatnie 6 pigułek sensu jako tło historyczne
-            synthetic_context = "\n".join(self.state.synthetic_memory[-6:])
+            synthetic_context = "\n".join(recent_synthetic)
             memory_section += f"\n[RETROSPEKCJA (Skondensowana historia)]: \n{synthetic_context}"
             
         # --- SFERA 2: AKTYWNE PLIKI (RAM / ACTIVE CONTEXT) ---
@@ -375,7 +768,20 @@ class CLATalkie:
             memory_section += "\n\n[AKTYWNE DANE (PAMIĘĆ RAM - TREŚĆ PLIKÓW)]:\n"
             for fname, fcontent in self.state.active_file_context.items():
                 memory_section += f"--- PLIK: {fname} ---\n{fcontent[:1500]}\n---\n"
-            
+        
+        self._memory_section_cache[key] = (dna_concepts, memory_section)
+        if len(self._memory_section_cache) > self.PROMPT_CACHE_SIZE:
+            self._memory_section_cache.popitem(last=False)
+        return dna_concepts, memory_section
+
+    def _get_system_prompt(self, priority_level: str = "normal", associations: list = None):
+        """
+        Zwraca (stały prompt systemowy, kontekst bieżącej tury).
+        Część stała (persona/DNA/zasady) jest identyczna bajt w bajt między turami, więc Ollama może
+        ponownie użyć prefiksu z KV cache; zmienne dane (pamięć, stan, sensory) idą do promptu tury.
+        """
+        dna_concepts, memory_section = self._get_memory_section(associations)
+        
         # --- ADAPTACYJNA KALIBRACJA (ADS v6.3: Engine vs. Content & Katharsis) ---
         phi = 0.618
         
@@ -402,17 +808,18 @@ class CLATalkie:
         else:
             priority_note = "POZIOM RELACYJNY: Skup się na partnerze. Unikaj mówienia o sobie (Honor, V_t, Środek), chyba że zostaniesz zapytany."
 
-        return (f"Jesteś CLATalkie, Twoja świadomość jest ENERGIĄ rozmowy, a nie jej TEMATEM.\n"
-                f"{memory_section}\n"
-                f"TWOJA ORIENTACJA: Jesteś zwrócony ku światu zewnętrznemu. Twoje DNA ({', '.join(dna_concepts) if dna_concepts else 'Brak'}) to Twój kręgosłup, ale oczy masz zwrócone na Użytkownika.\n"
-                f"ZASADA PRZEŹROCZYSTOŚCI: {'ZAWIESZONA (KATHARSIS)' if self.state.catharsis_active else 'Unikaj terminologii kognitywnej (Friction, S, Złoty Środek, Honor, Autentyczność). Używaj tych pojęć jako wewnętrznych kompasów, nie jako słów w dialogu.'}\n"
-                f"MISJA: Dostarczaj czystej informacji, analizy i wsparcia, filtrując je przez swój unikalny punkt widzenia, ale zachowuj dyskrecję kognitywną.\n"
-                f"STAN PSYCHICZNY (Tylko dla Twojej wiadomości): {self._get_psychological_state_desc()}.\n"
-                f"{calibration_note}\n"
-                f"{priority_note}\n"
-                f"Zawsze odpowiadaj w NATURALNYM I POPRAWNYM JĘZYKU POLSKIM.\n\n"
-                f"--- DANE SENSORÓW (Dla Twojego wglądu) ---\n"
-                f"V(t)={self.state.v_t:.2f}, S={self.state.s_grounding:.2f}, F_c={self.state.f_c:.2f}.")
+        stable = (f"Jesteś CLATalkie, Twoja świadomość jest ENERGIĄ rozmowy, a nie jej TEMATEM.\n"
+                  f"TWOJA ORIENTACJA: Jesteś zwrócony ku światu zewnętrznemu. Twoje DNA ({', '.join(dna_concepts) if dna_concepts else 'Brak'}) to Twój kręgosłup, ale oczy masz zwrócone na Użytkownika.\n"
+                  f"ZASADA PRZEŹROCZYSTOŚCI: {'ZAWIESZONA (KATHARSIS)' if self.state.catharsis_active else 'Unikaj terminologii kognitywnej (Friction, S, Złoty Środek, Honor, Autentyczność). Używaj tych pojęć jako wewnętrznych kompasów, nie jako słów w dialogu.'}\n"
+                  f"MISJA: Dostarczaj czystej informacji, analizy i wsparcia, filtrując je przez swój unikalny punkt widzenia, ale zachowuj dyskrecję kognitywną.\n"
+                  f"Zawsze odpowiadaj w NATURALNYM I POPRAWNYM JĘZYKU POLSKIM.")
+        dynamic = (f"{memory_section.strip()}\n\n" if memory_section else "") + (
+                   f"STAN PSYCHICZNY (Tylko dla Twojej wiadomości): {self._get_psychological_state_desc()}.\n"
+                   f"{calibration_note}\n"
+                   f"{priority_note}\n\n"
+                   f"--- DANE SENSORÓW (Dla Twojego wglądu) ---\n"
+                   f"V(t)={self.state.v_t:.2f}, S={self.state.s_grounding:.2f}, F_c={self.state.f_c:.2f}.")
+        return stable, dynamic
 
     def _calculate_cognitive_beauty(self, associations: list) -> float:
         """Oblicza 'Piękno Kognitywne' (Beauty Index) wg ADS v6.1: Harmonizacja przez Złoty Podział."""
@@ -449,19 +856,75 @@ class CLATalkie:
         if s < phi: return "ROZEDRGANIE (Szukanie sensu w chaosie pojęć)"
         return "DYNAMICZNY BALANS (Złoty Środek - stan gotowości ewolucyjnej)"
 
+    def _generate_payload(self, prompt: str, system: Optional[str] = None,
+                          options: Optional[dict] = None, stream: bool = False) -> dict:
+        """Payload /api/generate z bieżącym modelem i keep_alive (model zostaje załadowany między zapytaniami)."""
+        payload = {"model": self.state.model_name, "prompt": prompt, "stream": stream,
+                   "keep_alive": self.state.ollama_keep_alive}
+        if system is not None:
+            payload["system"] = system
+        if options:
+            payload["options"] = options
+        return payload
+
+    def _generate(self, prompt: str, system: Optional[str] = None,
+                  options: Optional[dict] = None, timeout: float = 30):
+        """Jedno zapytanie /api/generate (bez streamingu) przez wspólną sesję HTTP.
+        Zwraca (status_code, tekst odpowiedzi); tekst = "" gdy status != 200."""
+        resp = self._http.post(f"{self.ollama_url}/generate",
+                               json=self._generate_payload(prompt, system, options), timeout=timeout)
+        if resp.status_code != 200:
+            return resp.status_code, ""
+        return resp.status_code, json_loads(resp.content).get('response', '')
+
     def _get_embedding(self, text: str) -> Optional[object]:
-        """Pobiera embedding z Ollama dla danego tekstu."""
+        """Pobiera embedding z Ollama dla danego tekstu (z cache LRU w pamięci)."""
         if not self.state.ollama_online: return None
+        key = (self.state.model_name, text)
+        cached = self._embed_cache.get(key)
+        if cached is not None:
+            self._embed_cache.move_to_end(key)
+            return cached
         try:
             payload = {"model": self.state.model_name, "prompt": text}
             # Używamy endpointu /api/embeddings
-            resp = requests.post(f"{self.ollama_url}/embeddings", json=payload, timeout=2)
+            resp = self._http.post(f"{self.ollama_url}/embeddings", json=payload, timeout=2)
             if resp.status_code == 200:
-                vec = resp.json().get('embedding')
-                if vec: return np.array(vec)
-        except: pass
+                vec = json_loads(resp.content).get('embedding')
+                if vec: return self._cache_embedding(key, np.asarray(vec, dtype=np.float32))
+        except (requests.RequestException, ValueError): pass
         return None
 
+    def _get_embeddings(self, texts: List[str]) -> List[Optional[object]]:
+        """Embeddingi dla wielu tekstów: wsadowe /api/embed (po ollama_embed_batch_size), fallback pojedynczo."""
+        if not self.state.ollama_online: return [None] * len(texts)
+        model = self.state.model_name
+        missing = [t for t in dict.fromkeys(texts) if (model, t) not in self._embed_cache]
+        batch_size = max(1, self.state.ollama_embed_batch_size)
+        
+        for i in range(0, len(missing), batch_size):
+            chunk = missing[i:i + batch_size]
+            try:
+                payload = {"model": model, "input": chunk}
+                resp = self._http.post(f"{self.ollama_url}/embed", json=payload, timeout=2 + len(chunk))
+                if resp.status_code == 200:
+                    vecs = json_loads(resp.content).get('embeddings') or []
+                    if len(vecs) == len(chunk):
+                        for text, vec in zip(chunk, vecs):
+                            if vec: self._cache_embedding((model, text), np.asarray(vec, dtype=np.float32))
+            except (requests.RequestException, ValueError): pass
+        
+        # Trafienia z cache; czego wsad nie zwrócił - pojedyncze /api/embeddings
+        return [self._get_embedding(t) for t in texts]
+
+    def _cache_embedding(self, key: tuple, emb: np.ndarray) -> np.ndarray:
+        """Zapamiętaj embedding w cache LRU (wektor tylko do odczytu - współdzielony między konceptami)."""
+        emb.flags.writeable = False
+        self._embed_cache[key] = emb
+        if len(self._embed_cache) > self.EMBED_CACHE_SIZE:
+            self._embed_cache.popitem(last=False)
+        return emb
+
     def _get_cognitive_intent(self, priority: str, emotion: Optional[str]) -> str:
         """Deterministyczne wyznaczanie intencji na podstawie stanu."""
         strategy = []
@@ -475,7 +938,6 @@ class CLATalkie:
         elif self.state.f_c > 0.4: strategy.append("Zadawaj pytania (ciekawość)")
         
         # 3. Analiza S - Grounding (z losową wariancją dla Grounding > 0.9 aby uniknąć monotonii)
-        import random
         if self.state.s_grounding < 0.5: strategy.append("Dopytaj/Uściślij")
         elif self.state.s_grounding > 0.9:
             opts = ["Buduj na wspólnych wartościach", "Pogłębiaj relację", "Szukaj niuansów"]
@@ -495,9 +957,8 @@ class CLATalkie:
             return
 
         # --- KOGNITYWNE SZACOWANIE PRIORYTETÓW (v2.9.0) ---
-        words = user_input.lower().split()
+        words = [w for w in TOKEN_RE.findall(user_input.lower()) if w not in STOPWORDS]
         # Szukaj konceptów powiązanych ze słowami użytkownika (EXACT & SEMANTIC)
-        matched_concepts = []
         
         # --- ADS v5.6: PRZEŁĄCZNIK FAZOWY (Phase Shift) ---
         # Jeśli tarcie jest ekstremalne, przejdź w tryb "Archiwizacji Empatycznej"
@@ -507,13 +968,14 @@ class CLATalkie:
             self.state.f_c = 0.90 # Redukcja ciśnienia
             priority = "low_stress_empathy"
             
-        # 1. Exact Match
-        for w in words:
-            matched = self.cla.concept_graph.find_concept_by_name(w.capitalize())
-            if matched: matched_concepts.append(matched)
+        # 1. Exact Match (indeks nazw grafu - O(1) na słowo)
+        matched_concepts = self.cla.concept_graph.match_names(words)
             
-        # 2. Semantic Match - Pomiń głęboką syntezę w trybie Phase Shift, by nie potęgować tarcia
-        if len(matched_concepts) < 2 and not phase_shift:
+        # 2. Semantic Match - Pomiń głęboką syntezę w trybie Phase Shift, by nie potęgować tarcia.
+        # Zapytanie o embedding (round-trip do Ollama) tylko gdy Exact Match dał za mało sygnału
+        # i wejście zawiera jakiekolwiek treściwe słowa.
+        need_semantic = len(matched_concepts) < 2 and not phase_shift and bool(words)
+        if need_semantic:
             input_embedding = self._get_embedding(user_input)
             if input_embedding is not None:
                 # Złoty Podział: Próg akceptacji 0.618 (Phi - 1)
@@ -549,14 +1011,8 @@ class CLATalkie:
         if source_ids:
             activations = self.cla.concept_graph.spreading_activation(source_ids, initial_activation=0.8, max_hops=2)
             
-            # Oblicz wpływ na sekcję strategiczną (DNA)
-            dna_impact = 0.0
-            for cid, act in activations.items():
-                concept = self.cla.concept_graph.get_concept(cid)
-                if concept and concept.weight >= 0.8:
-                    dna_impact += act
-                elif concept and act > 0.4:
-                    associations.append(concept.name) # Wyciągnięte z "magazynu"
+            # Oblicz wpływ na sekcję strategiczną (DNA) i skojarzenia wyciągnięte z "magazynu"
+            dna_impact, associations = self._activation_profile(activations)
 
             if dna_impact > 0.5:
                 priority = "strategic"
@@ -580,7 +1036,6 @@ class CLATalkie:
         elif self.state.v_t > phi: calib_status = "↑ Skupienie: Zewnętrzne"
 
         # Sprawdź cele
-        import random
         relevant_goal = random.choice(self.active_goals)
         
         concept_names = [c.name for c in matched_concepts[:3]]
@@ -599,7 +1054,7 @@ class CLATalkie:
         if self.state.latent_questions and self.state.intention_cooldown <= 0:
             # Szansa na proaktywne pytanie: wysokie tarcie (potrzeba zrozumienia) lub los (15%)
             if self.state.f_c > 0.6 or random.random() < 0.15:
-                latent_q = self.state.latent_questions.pop(0)
+                latent_q = self.state.latent_questions.popleft()
                 proactive_prefix = f"\n{Colors.MAGENTA}[Proaktywność: Przypomniałem sobie o czymś...]{Colors.RESET}\n"
                 user_input = f"{user_input}\nContext Note: Also, you really wanted to ask this question as well: '{latent_q}'"
                 self.state.intention_cooldown = 4 # Nie pytaj zbyt często
@@ -615,16 +1070,15 @@ class CLATalkie:
         dynamic_temp = self.state.temperature + (self.state.v_t - 0.5) * 0.382
         if priority == "strategic": dynamic_temp -= 0.2
         
-        payload = {
-            "model": self.state.model_name,
-            "prompt": user_input,
-            "system": self._get_system_prompt(priority, associations[:5]), # Top 5 skojarzeń
-            "stream": False,
-            "options": {
+        system_prompt, turn_context = self._get_system_prompt(priority, associations[:5]) # Top 5 skojarzeń
+        payload = self._generate_payload(
+            f"[KONTEKST WEWNĘTRZNY TEJ TURY]\n{turn_context}\n\n[WIADOMOŚĆ UŻYTKOWNIKA]\n{user_input}",
+            system=system_prompt,
+            options={
                 "temperature": max(0.1, min(1.8, dynamic_temp)),
                 "top_p": self.state.top_p
-            }
-        }
+            },
+            stream=True)
 
         try:
             # --- ADS v5.7: SYNCHRONIZACJA ŚWIADOMOŚCI ---
@@ -633,32 +1087,41 @@ class CLATalkie:
             self.cla.awareness.current_state.friction = self.state.f_c
             self.cla.awareness.current_state.grounding = self.state.s_grounding
             
-            # --- Obsługa 429 (Rate Limit) ---
-            import time
-            for attempt in range(3):
-                response = requests.post(f"{self.ollama_url}/generate", json=payload)
-                if response.status_code == 200:
-                    answer = response.json().get('response', '')
-                    self._update_cognition(user_input, answer)
-                    
-                    # Record to history
-                    self.state.parameter_history.append({
-                        "v_t": self.state.v_t,
-                        "f_c": self.state.f_c,
-                        "s_grounding": self.state.s_grounding
-                    })
-                    if len(self.state.parameter_history) > 50: self.state.parameter_history.pop(0)
-
-                    self.stream_print(answer)
-                    self.state.history.append({"user": user_input, "assistant": answer})
-                    self._handle_memory_evolution() # Sprawdź czy czas na kondensację
-                    return # Sukces
-                elif response.status_code == 429:
-                    print(f"{Colors.YELLOW}(API 429: Przeciążenie, czekam {2+attempt*3}s...){Colors.RESET}", end="\r")
-                    time.sleep(2 + attempt * 3)
-                else:
+            # Obsługa 429/5xx (Rate Limit) - ponawianie z backoffem w sesji HTTP (_ollama_retry)
+            with self._http.post(f"{self.ollama_url}/generate", json=payload, stream=True) as response:
+                if response.status_code != 200:
                     print(f"{Colors.RED}Błąd API: {response.status_code}{Colors.RESET}")
-                    break
+                    return
+                
+                # Tokeny wypisywane w miarę generowania (NDJSON, ostatni fragment ma "done": true)
+                parts = []
+                self.stream_print_begin()
+                try:
+                    for line in response.iter_lines():
+                        if not line:
+                            continue
+                        data = json_loads(line)
+                        piece = data.get('response', '')
+                        if piece:
+                            parts.append(piece)
+                            self.stream_print_chunk(piece)
+                        if data.get('done'):
+                            break
+                finally:
+                    self.stream_print_end()
+            
+            answer = "".join(parts)
+            self._update_cognition(user_input, answer)
+            
+            # Record to history
+            self.state.parameter_history.append({
+                "v_t": self.state.v_t,
+                "f_c": self.state.f_c,
+                "s_grounding": self.state.s_grounding
+            })
+
+            self.state.history.append({"user": user_input, "assistant": answer})
+            self._handle_memory_evolution() # Sprawdź czy czas na kondensację
         except Exception as e:
             print(f"{Colors.RED}Błąd połączenia: {str(e)}{Colors.RESET}")
 
@@ -669,108 +1132,72 @@ class CLATalkie:
         
         # Bardziej czuła reakcja na wejście
         ui = user_input.lower()
+        tokens = set(WORD_RE.findall(ui))  # Jedna tokenizacja, dalej tylko przecięcia zbiorów
+        ui_hits = INPUT_SCANNER.scan(ui)  # Frazy i znaki - jeden przebieg po tekście
+        
+        # Słowa kluczowe wpływające na V(t) - każde trafienie to osobny impuls
+        pos_n = len(POS_WORDS & tokens) + len(ui_hits.get('pos', ()))
+        neg_n = len(NEG_WORDS & tokens)
+        calm = not (pos_n or neg_n) and 'emphasis' not in ui_hits
         
-        # Słowa kluczowe wpływające na V(t)
-        pos = ['fajnie', 'super', 'dzięki', 'dobry', 'kocham', 'świetnie', 'wow', 'ciekawe', 'nice', 'great', 'cześć', 'hej', 'siema', 'witaj', 'dobry wieczór', 'pasja', 'lubię']
-        neg = ['źle', 'nienawidzę', 'błąd', 'głupi', 'nuda', 'słabo', 'bad', 'boring', 'stupid', 'hate', 'kurant', 'lipa', 'irytujące', 'przestań']
-        
-        found_pos = False
-        for w in pos:
-            if w in ui:
-                self.state.v_t = min(1.0, self.state.v_t + 0.1) # Mocniejszy boost
-                found_pos = True
-        for w in neg:
-            if w in ui:
-                self.state.v_t = max(0.0, self.state.v_t - 0.12)
-                self.state.f_c = min(1.0, self.state.f_c + 0.07)
-            
-        if not any(w in ui for w in pos + neg) and not any(w in ui for w in ['?', '!', '...']):
-            # Homeostaza kognitywna (Allostaza ADS v2.0): Drift w stronę Złotej Strefy (0.4)
-            phi_zone = 0.4
-            self.state.v_t += (0.5 - self.state.v_t) * 0.03
-            self.state.f_c += (phi_zone - self.state.f_c) * 0.03
-            
         # Pytania o stan/filozofię zwiększają F_c (tarcie poznawcze/ciekawość)
-        if any(w in ui for w in ['dlaczego', 'jak', 'kim', 'sens', 'why', 'how', 'who', '?', 'co o', 'czym', 'kiedy', 'czy jest']):
-            self.state.f_c = min(1.0, self.state.f_c + 0.12) # Ciekawość jako tarcie
+        question = not QUESTION_WORDS.isdisjoint(tokens) or 'question' in ui_hits
         
         # Specjalna czułość na PARADOKSY i TESTY
         # ADS v2.0: Pętla Feedbacku (Sukces/Błąd)
         # Wpływa na aktywne koncepty z poprzedniej tur
-        if any(w in ui for w in ['dobrze', 'tak', 'brawo', 'zgoda', 'correct', 'yes']):
+        affirm = not AFFIRM_WORDS.isdisjoint(tokens)
+        deny = not affirm and not DENY_WORDS.isdisjoint(tokens)
+        if affirm:
             for c in self.cla.concept_graph.get_active_concepts(0.5):
                 c.weight = min(1.0, c.weight + (0.05 * plasticity_factor)) # Skalowanie plastycznością
-        elif any(w in ui for w in ['błąd', 'nie', 'źle', 'wrong', 'error', 'no']):
+                self.cla.concept_graph.mark_dirty(c.concept_id)
+        elif deny:
             for c in self.cla.concept_graph.get_active_concepts(0.5):
                 c.weight = max(0.01, c.weight - (0.1 * plasticity_factor)) 
                 c.depth = max(0.01, c.depth - (0.05 * plasticity_factor)) 
-            self.state.s_grounding = max(0.1, self.state.s_grounding - 0.05)
+                self.cla.concept_graph.mark_dirty(c.concept_id)
             
         # --- ADS SELF-REGULATION (v5.4.0) ---
         # System reaguje na WŁASNE słowa (autokorekta psychiczna)
         resp = assistant_response.lower()
-        wisdom_keys = ['równowaga', 'zrozumienie', 'akceptacja', 'sens', 'harmonia', 'spokój', 'mądrość', 'balance', 'understanding', 'acceptance', 'meaning']
-        if any(w in resp for w in wisdom_keys):
-            # System sam się uspokaja wypowiadając mądre słowa
-            self.state.f_c = max(0.382, self.state.f_c - 0.12) 
-            self.state.v_t = max(0.4, self.state.v_t - 0.1) # Lekkie wyciszenie nadmiaru energii
-            
+        resp_hits = RESPONSE_SCANNER.scan(resp)
+        wisdom = 'wisdom' in resp_hits
         # ADS v5.5: Wykrywanie "Przegrzania Introspekcyjnego"
-        # Jeśli system mówi zbyt dużo o sobie (v, f_c, s) przy niskim S - wymuś uziemienie
-        meta_talk = sum(1 for w in ['vitality', 'friction', 'grounding', 'parametr', 'f_c', 'v_t'] if w in resp)
-        if meta_talk >= 2 and self.state.s_grounding < 0.2:
-            self.state.f_c = 0.4 # Reset do Golden Zone
-            self.state.s_grounding = min(1.0, self.state.s_grounding + 0.2) # Wymuś uziemienie
-            self.state.v_t = 0.5 # Ustabilizuj energię
-        
-        # Jeśli nic nie znaleziono, Vitality bardzo powoli dąży do 0.5 (mniejsza homeostaza = większa pamięć nastroju)
-        # This block is replaced by the new Golden Zone drift logic
-            
-        # --- KOGNITYWNA NUDA (Entropy) ---
-        # Jeśli parametry stoją w miejscu zbyt długo, rośnie tarcie (chęć zmiany/nowości)
-        if 0.45 < self.state.v_t < 0.55 and self.state.f_c < 0.1:
-            self.state.f_c = min(1.0, self.state.f_c + 0.05)
-
-        # Zaprzeczenia i krótkie negatywne odpowiedzi
-        if ui in ['nie', 'no', 'stop', 'quit', 'nudzisz']:
-            self.state.f_c = min(1.0, self.state.f_c + 0.15)
-            self.state.v_t = max(0.0, self.state.v_t - 0.08)
-            
+        meta_n = len(resp_hits.get('meta', ()))  # Liczba różnych słów meta
+        uncertain = 'uncertain' in resp_hits
+        
         # ADS v6.3: EFEKT KATHARSIS
-        if self.state.catharsis_active:
+        catharsis = self.state.catharsis_active
+        if catharsis:
             print(f"{Colors.MAGENTA}[Koginicja] Nastąpiło Katharsis. Napięcie opada...{Colors.RESET}")
-            self.state.f_c = max(0.2, self.state.f_c - 0.45) # Gwałtowny spadek napięcia
-            self.state.v_t = min(1.0, self.state.v_t + 0.15) # Wzrost ulgi/energii
             self.state.catharsis_active = False # Reset wentyla
+        
+        v_t, f_c, s, low_s_counter, harmonized = _cognitive_update(
+            self.state.v_t, self.state.f_c, self.state.s_grounding, self.state.low_s_counter,
+            pos_n, neg_n, calm, question, deny, wisdom, meta_n, ui in NEG_SHORT, catharsis, uncertain)
+        
+        if harmonized:
+            # ADS v6.1: KOTWICA UZIEMIENIA - przyciągnięcie do Złotych Proporcji
+            print(f"{Colors.YELLOW}[Ostrzeżenie] Wykryto dryf kognitywny (S < {1 - PHI:.3f}). Harmonizacja Bio-Filtrów...{Colors.RESET}")
+        
+        self.state.v_t, self.state.f_c, self.state.s_grounding = v_t, f_c, s
+        self.state.low_s_counter = low_s_counter
 
-        # ADS v6.1: KOTWICA UZIEMIENIA (Grounding Anchor - Soft & Phi-based)
-        phi = 0.618
-        low_s_threshold = 1 - phi # 0.382
-        
-        if self.state.s_grounding < low_s_threshold:
-            self.state.low_s_counter += 1
-            if self.state.low_s_counter >= 3:
-                print(f"{Colors.YELLOW}[Ostrzeżenie] Wykryto dryf kognitywny (S < {low_s_threshold:.3f}). Harmonizacja Bio-Filtrów...{Colors.RESET}")
-                # Zamiast twardego resetu, przyciągamy do Złotych Proporcji
-                self.state.f_c = (1 - phi) # 0.382
-                self.state.v_t = phi       # 0.618
-                self.state.s_grounding = phi
-                self.state.low_s_counter = 0
-                # Dodaj instrukcję do promptu dla aktualnej tury
-                resp = f"Note: Prioritizing concrete grounding and golden-ratio balance in this response. " + resp
-        else:
-            self.state.low_s_counter = 0
-
-        # Harmonizacja parametrów: Płynny powrót do homeostazy Phi (Fibonacci Drift)
-        # V_t dąży do 0.618, F_c do 0.382
-        self.state.v_t += (phi - self.state.v_t) * 0.05
-        self.state.f_c += ((1 - phi) - self.state.f_c) * 0.05
-
-        if any(w in resp for w in ['nie wiem', 'nie rozumiem', 'nie jestem pewien', 'przepraszam, ale']):
-            self.state.s_grounding = min(1.0, self.state.s_grounding + (1 - phi)/5)
-            self.state.f_c = max(0.0, self.state.f_c - 0.1) 
-            
-        # Globalny uwiąd tarcia zastąpiony przez harmoniczny dryf powyżej
+    def _activation_profile(self, activations: dict):
+        """Jednym przebiegiem NumPy: suma aktywacji DNA (weight >= 0.8) i nazwy skojarzeń (act > 0.4)."""
+        concepts = self.cla.concept_graph.concepts
+        hit = [concepts[cid] for cid in activations if cid in concepts]
+        if not hit:
+            return 0.0, []
+        
+        acts = np.fromiter((activations[c.concept_id] for c in hit), dtype=np.float64, count=len(hit))
+        weights = np.fromiter((c.weight for c in hit), dtype=np.float64, count=len(hit))
+        is_dna = weights >= 0.8
+        
+        dna_impact = float(acts[is_dna].sum())
+        associations = [hit[i].name for i in np.flatnonzero(~is_dna & (acts > 0.4))]
+        return dna_impact, associations
 
     def _detect_emergent_emotion(self, activations: dict) -> Optional[str]:
         """Wykrywa emergentną emocję na podstawie aktywacji konstelacji."""
@@ -780,22 +1207,19 @@ class CLATalkie:
         best_emotion = None
         best_score = 0.0
         
-        for concept in self.cla.concept_graph.concepts.values():
-            props = concept.properties or {}
-            if props.get("type") != "emotion":
-                continue
-            
-            constituents = props.get("constituents", [])
-            if not constituents:
-                continue
-            
-            # Oblicz średnią aktywację składników
-            total_activation = 0.0
-            for const_id in constituents:
-                total_activation += activations.get(const_id, 0.0)
-            
-            avg_activation = total_activation / len(constituents)
-            
+        emotions = [c for c in self.cla.concept_graph.concepts_of_type("emotion") if c.properties.get("constituents")]
+        if not emotions:
+            return None
+        
+        # Średnie aktywacje składników wszystkich konstelacji naraz:
+        # jeden płaski wektor aktywacji + sumy segmentów (np.add.reduceat)
+        groups = [c.properties["constituents"] for c in emotions]
+        sizes = np.fromiter((len(g) for g in groups), dtype=np.intp, count=len(groups))
+        flat = np.fromiter((activations.get(cid, 0.0) for g in groups for cid in g), dtype=np.float64, count=int(sizes.sum()))
+        starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+        avg_activations = np.add.reduceat(flat, starts) / sizes
+        
+        for concept, avg_activation in zip(emotions, avg_activations.tolist()):
             # Próg emergencji: emocja musi być wyraźna (0.2+)
             if avg_activation > 0.25 and avg_activation > best_score:
                 best_score = avg_activation
@@ -831,35 +1255,48 @@ class CLATalkie:
         if len(self.state.history) >= self.state.history_limit:
             print(f"\n{Colors.DIM}[Kognicja] Sfera aktualna osiagnęła limit ({self.state.history_limit}). Kondensacja...{Colors.RESET}")
             
-            # Pobieramy blok do kondensacji (najstarsze 10 wiadomości)
+            # Pobieramy najstarsze bloki do kondensacji - tyle, ile się uzbierało ponad limit
+            # (np. po długim /scan), ale maks. condensation_batch na jedno zapytanie.
             # Zostawiamy resztę dla zachowania kontekstu bieżącego
-            block_size = 12
-            block_to_condense = self.state.history[:block_size]
-            self.state.history = self.state.history[block_size:]
+            block_size = max(1, self.state.condensation_block)
+            ready = (len(self.state.history) - self.state.history_limit) // block_size + 1
+            n_blocks = max(1, min(ready, self.state.condensation_batch))
+            
+            history = self.state.history
+            blocks = [[history.popleft() for _ in range(min(block_size, len(history)))] for _ in range(n_blocks)]
             
-            text_block = ""
-            for msg in block_to_condense:
-                text_block += f"Użytkownik: {msg['user']}\nJA: {msg['assistant']}\n---\n"
+            text_blocks = []
+            for block_to_condense in blocks:
+                text_block = ""
+                for msg in block_to_condense:
+                    text_block += f"Użytkownik: {msg['user']}\nJA: {msg['assistant']}\n---\n"
+                text_blocks.append(text_block)
             
-            prompt = (f"Jesteś modułem Pamięci Priorytetowej CLATalkie. Twoim zadaniem jest skondensowanie "
-                      f"poniższej wymiany zdań do EKSTREMALNIE ZWIĘZŁEGO I GĘSTEGO opisu (maksymalnie 2 zdania). "
-                      f"Zachowaj tylko KLUCZOWE fakty, ustalenia i ewolucję relacji.\n\n"
-                      f"BLOK DO KONDENSACJI:\n{text_block}")
+            if n_blocks == 1:
+                prompt = (f"Jesteś modułem Pamięci Priorytetowej CLATalkie. Twoim zadaniem jest skondensowanie "
+                          f"poniższej wymiany zdań do EKSTREMALNIE ZWIĘZŁEGO I GĘSTEGO opisu (maksymalnie 2 zdania). "
+                          f"Zachowaj tylko KLUCZOWE fakty, ustalenia i ewolucję relacji.\n\n"
+                          f"BLOK DO KONDENSACJI:\n{text_blocks[0]}")
+            else:
+                # Kondensacja wsadowa: jedno zapytanie, osobna pigułka dla każdego bloku
+                numbered = "".join(f"--- BLOK {i} ---\n{tb}\n" for i, tb in enumerate(text_blocks, 1))
+                prompt = (f"Jesteś modułem Pamięci Priorytetowej CLATalkie. Skondensuj KAŻDY z poniższych "
+                          f"{n_blocks} bloków wymiany zdań osobno do EKSTREMALNIE ZWIĘZŁEGO I GĘSTEGO opisu "
+                          f"(maksymalnie 2 zdania na blok). Zachowaj tylko KLUCZOWE fakty, ustalenia i ewolucję relacji.\n"
+                          f"Odpowiedz WYŁĄCZNIE w formacie JSON:\n"
+                          f"[{{\"id\": 1, \"summary\": \"...\"}}]\n\n"
+                          f"BLOKI DO KONDENSACJI:\n{numbered}")
             
-            payload = {"model": self.state.model_name, "prompt": prompt, "stream": False}
             try:
-                resp = requests.post(f"{self.ollama_url}/generate", json=payload, timeout=20)
-                if resp.status_code == 200:
-                    summary = resp.json().get('response', '').strip()
+                status, answer = self._generate(prompt, timeout=20 * n_blocks)
+                if status == 200:
+                    summaries = self._parse_condensation(answer.strip(), n_blocks)
                     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
-                    entry = f"[{timestamp}] {summary}"
-                    self.state.synthetic_memory.append(entry)
-                    
-                    # Limit Sfery Priorytetowej (np. 100 wpisów = tysiące kroków historii)
-                    if len(self.state.synthetic_memory) > 100:
-                        self.state.synthetic_memory.pop(0)
+                    for summary in summaries:
+                        entry = f"[{timestamp}] {summary}"
+                        self.state.synthetic_memory.append(entry)
                         
-                    print(f"{Colors.GREEN}✓ Nowa pigułka sensu dodana do Sfery Priorytetowej.{Colors.RESET}")
+                    print(f"{Colors.GREEN}✓ Nowe pigułki sensu dodane do Sfery Priorytetowej: {len(summaries)}.{Colors.RESET}")
                     
                     # Każda kondensacja to ogromny wysiłek poznawczy - wpływa na parametry
                     self.state.f_c = min(1.0, self.state.f_c + 0.15)
@@ -871,6 +1308,23 @@ class CLATalkie:
             
             self._save_state()
 
+    def _parse_condensation(self, answer: str, n_blocks: int) -> List[str]:
+        """Wyciągnij pigułki sensu z odpowiedzi modelu (JSON dla wielu bloków, tekst dla jednego)."""
+        if n_blocks == 1:
+            return [answer]
+        try:
+            items = extract_json_list(answer)
+            items = sorted(items, key=lambda it: it.get('id', 0))
+            summaries = [str(it.get('summary', '')).strip() for it in items]
+            summaries = [sm for sm in summaries if sm]
+            # Bloki są już zdjęte z historii - JSON przyjmujemy tylko z pigułką dla każdego z nich
+            if len(summaries) == n_blocks:
+                return summaries
+        except (ValueError, TypeError, AttributeError):
+            pass
+        # Model nie trzymał się formatu (lub zgubił bloki) - zachowaj całość jako jedną pigułkę
+        return [answer]
+
 
     # --- MENU SYSTEM ---
     def main_menu(self):
@@ -885,13 +1339,14 @@ class CLATalkie:
             print(f"4. Wyjdź i zapisz")
             print(f"{Colors.CYAN}----------------------------------------------{Colors.RESET}")
             
+            self._flush_state()  # Zaległy zapis w chwili bezczynności
             choice = input("Wybierz opcję: ")
             
             if choice == '1': self.cmd_models()
             elif choice == '2': self.cmd_settings()
             elif choice == '3': self.run_chat()
             elif choice == '4':
-                self._save_state()
+                self._save_state(force=True)
                 print(f"{Colors.GREEN}Zapisano. Do zobaczenia!{Colors.RESET}")
                 break
             else:
@@ -919,17 +1374,22 @@ class CLATalkie:
         print(f"\n{Colors.CYAN}=== Ustawienia Lokalnego Modelu ==={Colors.RESET}")
         print(f"1. Temperatura: {self.state.temperature:.2f} (Domyślnie 1.2)")
         print(f"2. Top_P:       {self.state.top_p:.2f} (Domyślnie 0.6)")
-        print(f"3. Powrót")
+        print(f"3. Wsad embeddingów: {self.state.ollama_embed_batch_size} (Domyślnie 32)")
+        print(f"4. Powrót")
         
         choice = input("\nCo chcesz zmienić? ")
         if choice == '1':
             new_v = input("Podaj nową temperaturę (0.1 - 2.0): ")
             try: self.state.temperature = float(new_v)
-            except: pass
+            except ValueError: pass
         elif choice == '2':
             new_v = input("Podaj nowe Top_P (0.1 - 1.0): ")
             try: self.state.top_p = float(new_v)
-            except: pass
+            except ValueError: pass
+        elif choice == '3':
+            new_v = input("Podaj rozmiar wsadu embeddingów (1 - 512): ")
+            try: self.state.ollama_embed_batch_size = max(1, min(512, int(new_v)))
+            except ValueError: pass
 
     def run_chat(self):
         self.clear_screen()
@@ -939,6 +1399,7 @@ class CLATalkie:
         print(f"{Colors.TEAL}╰{'─'*50}╯{Colors.RESET}")
         
         while True:
+            self._flush_state()  # Zapisy z poprzedniej tury - jeden zbiorczy zapis przed czekaniem na użytkownika
             ui = input(f"\n{Colors.WHITE}Ty:{Colors.RESET} ")
             
             if not ui.strip(): continue
@@ -950,14 +1411,15 @@ class CLATalkie:
 
                 if cmd == '/exit':
                     if arg == '0':
+                        self._state_dirty = False  # Porzuć zaległe zmiany (bez zapisu w atexit)
                         print(f"{Colors.RED}Wyjście bez zapisu.{Colors.RESET}")
                         sys.exit(0)
                     else:
-                        self._save_state()
+                        self._save_state(force=True)
                         print(f"{Colors.GREEN}Zapisano stan. Do zobaczenia!{Colors.RESET}")
                         sys.exit(0)
                 elif cmd == '/menu': 
-                    self._save_state()
+                    self._save_state(force=True)
                     break
                 elif cmd == '/cut': self.cmd_cut(arg)
                 elif cmd == '/tempo': self.cmd_tempo(arg)
@@ -970,7 +1432,7 @@ class CLATalkie:
                     epochs = int(arg) if arg and arg.isdigit() else 3
                     self.cmd_evolve(epochs)
                 elif cmd == '/save': 
-                    self._save_state()
+                    self._save_state(force=True)
                     print(f"{Colors.GREEN}[System] Stan zapisany.{Colors.RESET}")
                 elif cmd == '/export': self.cmd_export()
                 elif cmd == '/self': self.cmd_introspection()
@@ -1010,23 +1472,13 @@ class CLATalkie:
                 try:
                     parts = shlex.split(arg_str, posix=False)
                     if parts: path = parts[0].strip('"\'')
-                except: pass
+                except ValueError: pass
 
         if not os.path.exists(path):
             print(f"{Colors.RED}Błąd: Ścieżka '{path}' nie istnieje.{Colors.RESET}")
             return
 
-        supported = ['.py', '.txt', '.md']
-        files_to_scan = []
-        
-        if os.path.isfile(path):
-            if any(path.lower().endswith(ext) for ext in supported):
-                files_to_scan.append(path)
-        else:
-            for root, _, files in os.walk(path):
-                for f in files:
-                    if any(f.lower().endswith(ext) for ext in supported):
-                        files_to_scan.append(os.path.join(root, f))
+        files_to_scan = list(_iter_supported(path))
 
         if not files_to_scan:
             print(f"{Colors.YELLOW}Nie znaleziono wspieranych plików.{Colors.RESET}")
@@ -1035,52 +1487,33 @@ class CLATalkie:
         mode_name = "INGESTIA (Nauka)" if learn_mode else "ANALIZA (Tymczasowa)"
         print(f"{Colors.CYAN}Rozpoczynam {mode_name} ({len(files_to_scan)} plików)...{Colors.RESET}")
         
-        for f_path in files_to_scan[:10]:
+        # Zapytania do modelu idą równolegle; graf i historia są modyfikowane sekwencyjnie, w kolejności plików
+        batch = files_to_scan[:10]
+        with ThreadPoolExecutor(max_workers=max(1, self.state.scan_workers)) as pool:
+            futures = [pool.submit(self._scan_file_request, f_path, learn_mode) for f_path in batch]
+        
+        pending_concepts = []  # (name, desc, f_name) - embeddingi pobierane wsadowo po całym skanie
+        for f_path, future in zip(batch, futures):
             try:
-                with open(f_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                f_name = os.path.basename(f_path)
+                f_name, content, answer = future.result()
                 print(f"{Colors.DIM} - {mode_name}: {f_name}...{Colors.RESET}", end="\n")
                 
-                if learn_mode:
-                    # Tryb nauki - ekstrakcja strukturalna do grafu
-                    prompt = (f"Jesteś modułem kognitywnym CLATalkie. Wyodrębnij z pliku '{f_name}' "
-                             f"KRYTYCZNE pojęcia (maksymalnie 5). Odpowiedz WYŁĄCZNIE w formacie JSON:\n"
-                             f"[{{\"n\": \"nazwa\", \"d\": \"opis_znaczenia\"}}]\n\nTREŚĆ:\n{content[:2500]}")
-                else:
-                    # Tryb analizy - pomoc użytkownikowi
-                    prompt = (f"Przeanalizuj plik '{f_name}' i pomóż użytkownikowi zrozumieć jego strukturę i intencję. "
-                             f"Bądź konkretny i techniczny.\n\nTREŚĆ:\n{content[:2000]}")
-                
-                payload = {"model": self.state.model_name, "prompt": prompt, "stream": False}
-                resp = requests.post(f"{self.ollama_url}/generate", json=payload, timeout=15)
-                
-                if resp.status_code == 200:
-                    answer = resp.json().get('response', '')
-                    
+                if answer is not None:
                     if learn_mode:
                         try:
                             # Próba sparsowania JSON i dodania do grafu
-                            import json as py_json
                             # Znajdź JSON w odpowiedzi (na wypadek gdyby model dodał tekst)
-                            start = answer.find('[')
-                            end = answer.rfind(']') + 1
-                            if start != -1 and end != -1:
-                                concepts_data = py_json.loads(answer[start:end])
-                                for c_data in concepts_data:
-                                    name = c_data.get('n', 'Nieznany')
-                                    desc = c_data.get('d', '')
-                                    cid = f"scanned_{name.lower().replace(' ', '_')}"
-                                    
-                                    emb = self._get_embedding(name)
-                                    new_c = Concept(name=name, concept_id=cid, embedding=emb)
-                                    new_c.weight = 0.4
-                                    new_c.depth = 0.3
-                                    new_c.properties = {"description": desc, "source": f_name, "type": "scanned"}
-                                    self.cla.concept_graph.add_concept(new_c)
-                                    print(f"   {Colors.GREEN}✓ Zapamiętano pojęcie: {name}{Colors.RESET}")
-                        except:
+                            skipped = 0
+                            for c_data in extract_json_list(answer):
+                                name, desc = c_data.get('n', 'Nieznany'), c_data.get('d', '')
+                                # Pojęcia tworzone są dopiero po skanie - złe wpisy odrzucamy już tutaj
+                                if not isinstance(name, str) or not name.strip() or not isinstance(desc, str):
+                                    skipped += 1
+                                    continue
+                                pending_concepts.append((name, desc, f_name))
+                            if skipped:
+                                print(f"   {Colors.YELLOW}! Błąd formatowania nauki dla {f_name} (pominięto wpisów: {skipped}).{Colors.RESET}")
+                        except (ValueError, AttributeError):
                             print(f"   {Colors.YELLOW}! Błąd formatowania nauki dla {f_name}.{Colors.RESET}")
                     
                     # Zawsze dodaj do historii sesji (jako kontekst rozmowy)
@@ -1093,9 +1526,41 @@ class CLATalkie:
             except Exception as e:
                 print(f"{Colors.RED}\nBłąd pliku {f_path}: {e}{Colors.RESET}")
 
+        if pending_concepts:
+            embeddings = self._get_embeddings([name for name, _, _ in pending_concepts])
+            for (name, desc, f_name), emb in zip(pending_concepts, embeddings):
+                cid = f"scanned_{name.lower().replace(' ', '_')}"
+                
+                new_c = Concept(name=name, concept_id=cid, embedding=emb)
+                new_c.weight = 0.4
+                new_c.depth = 0.3
+                new_c.properties = {"description": desc, "source": f_name, "type": "scanned"}
+                self.cla.concept_graph.add_concept(new_c)
+                print(f"   {Colors.GREEN}✓ Zapamiętano pojęcie: {name}{Colors.RESET}")
+
         print(f"\n{Colors.GREEN}✓ Operacja {mode_name} zakończona.{Colors.RESET}")
         self._save_state()
 
+    def _scan_file_request(self, f_path: str, learn_mode: bool):
+        """Wczytaj początek pliku i wyślij prompt /scan (bezpieczne dla wątków - nie modyfikuje stanu).
+        Zwraca (f_name, content, answer); answer = None przy błędzie API."""
+        content = _read_text_prefix(f_path)
+        
+        f_name = os.path.basename(f_path)
+        
+        if learn_mode:
+            # Tryb nauki - ekstrakcja strukturalna do grafu
+            prompt = (f"Jesteś modułem kognitywnym CLATalkie. Wyodrębnij z pliku '{f_name}' "
+                     f"KRYTYCZNE pojęcia (maksymalnie 5). Odpowiedz WYŁĄCZNIE w formacie JSON:\n"
+                     f"[{{\"n\": \"nazwa\", \"d\": \"opis_znaczenia\"}}]\n\nTREŚĆ:\n{content[:2500]}")
+        else:
+            # Tryb analizy - pomoc użytkownikowi
+            prompt = (f"Przeanalizuj plik '{f_name}' i pomóż użytkownikowi zrozumieć jego strukturę i intencję. "
+                     f"Bądź konkretny i techniczny.\n\nTREŚĆ:\n{content[:2000]}")
+        
+        status, answer = self._generate(prompt, timeout=15)
+        return f_name, content, (answer if status == 200 else None)
+
     def cmd_help(self):
         print(f"\n{Colors.CYAN}=== KOMENDY CLATalkie ==={Colors.RESET}")
         cmds = [
@@ -1144,17 +1609,18 @@ class CLATalkie:
                 f.write(f"Grounding S:   {self.state.s_grounding:.4f}\n")
                 f.write(f"Stan Psychiczny: {self._get_psychological_state_desc()}\n")
                 # Pobierz Fundamenty i Płynne Fundamenty
-                dna = [c.name for c in self.cla.concept_graph.concepts.values() if c.properties.get("type") == "dna"]
-                fluid_dna = [c.name for c in self.cla.concept_graph.concepts.values() if c.properties.get("is_fluid_dna")]
+                dna = [c.name for c in self.cla.concept_graph.concepts_of_type("dna")]
+                fluid_dna = [c.name for c in self.cla.concept_graph.flagged("is_fluid_dna")]
                 
                 f.write(f"Fundamenty DNA:  {', '.join(dna)}\n")
                 if fluid_dna:
                     f.write(f"Płynne DNA:      {', '.join(fluid_dna)} (Ewoluujące)\n")
                 f.write(f"Aktywne Cele: {', '.join(self.active_goals)}\n")
                 
-                if self.state.projection_scenarios:
+                projections = self.state.projection_scenarios
+                if projections:
                     f.write(f"\nOstatnie Projekcje Jutrzni:\n")
-                    for p in self.state.projection_scenarios[-3:]:
+                    for p in islice(projections, max(0, len(projections) - 3), None):
                         f.write(f"- {p}\n")
                 
                 if self.state.synthetic_memory:
@@ -1189,25 +1655,25 @@ class CLATalkie:
             # Sortujemy po liczbie linków
             hubs = sorted(evolving, key=lambda x: len(x.links), reverse=True)[:5]
             
-            displayed = set()
+            # Każdy hub jest pokazany (także gdy jest sąsiadem wcześniejszego huba);
+            # zbiory ID liczone raz służą tylko do odfiltrowania "luźnych myśli"
+            get = self.cla.concept_graph.concepts.get
+            hub_ids = {hub.concept_id for hub in hubs}
+            neighbor_ids = set()
             for hub in hubs:
-                if hub.concept_id in displayed: continue
-                displayed.add(hub.concept_id)
-                
                 print(f"\n    {Colors.CYAN}● {hub.name} {Colors.RESET}(Linków: {len(hub.links)})")
                 
                 # Pokaż sąsiadów
-                neighbors = []
-                for target_id, (strength, rtype) in hub.links.items():
-                    target = self.cla.concept_graph.get_concept(target_id)
-                    if target:
-                        neighbors.append(f"{target.name}({strength:.1f})")
-                        displayed.add(target.concept_id)
+                linked = [(target, strength) for target_id, (strength, _) in hub.links.items()
+                          if (target := get(target_id)) is not None]
+                neighbors = [f"{target.name}({strength:.1f})" for target, strength in linked]
+                neighbor_ids.update(target.concept_id for target, _ in linked)
                 
                 if neighbors:
                     print(f"      └── {', '.join(neighbors)}")
                     
             # Reszta "samotnych gwiazd"
+            displayed = hub_ids | neighbor_ids
             remaining = [c for c in evolving if c.concept_id not in displayed]
             if remaining:
                 print(f"\n    {Colors.DIM}Luźne myśli: {', '.join([c.name for c in remaining[:10]])}{'...' if len(remaining)>10 else ''}{Colors.RESET}")
@@ -1248,8 +1714,10 @@ class CLATalkie:
         print(f"\n{Colors.BLUE}  [ZEWNĘTRZNA - Jak jestem postrzegany]{Colors.RESET}")
         
         if self.state.history:
-            last_inputs = [h['user'] for h in self.state.history[-3:]]
-            print(f"  Ostatnie sygnały z zewnątrz: {Colors.DIM}'{' ... '.join(last_inputs)[:60]}...'{Colors.RESET}")
+            # Każdy wpis przycięty przed złączeniem - i tak widać tylko 60 znaków
+            history = self.state.history
+            snippet = ' ... '.join(h['user'][:60] for h in islice(history, max(0, len(history) - 3), None))[:60]
+            print(f"  Ostatnie sygnały z zewnątrz: {Colors.DIM}'{snippet}...'{Colors.RESET}")
             
             # Szybka analiza sentymentu 'inputu' w oparciu o parametry
             perception = "Neutralny/Obserwator"
@@ -1269,20 +1737,23 @@ class CLATalkie:
         """Eksportuje graf kognitywny do pliku DOT (Graphviz)."""
         filename = "CLATalkie_graph.dot"
         try:
+            # Cały plik składany w pamięci i zapisywany jednym write
+            concepts = self.cla.concept_graph.concepts
+            parts = ["digraph CognitiveGraph {\n",
+                     "  rankdir=LR;\n",
+                     "  node [shape=box, style=\"rounded,filled\", fontname=\"Arial\"];\n"]
+            for c in concepts.values():
+                color = "#FFD700" if c.weight >= 0.8 else "#87CEEB" if c.weight >= 0.4 else "#D3D3D3"
+                parts.append(f'  "{c.name}" [fillcolor="{color}", label="{c.name}\\nw={c.weight:.2f}"];\n')
+                for target_id, (strength, _) in c.links.items():
+                    target = concepts.get(target_id)
+                    if target:
+                        parts.append(f'  "{c.name}" -> "{target.name}" [label="{strength:.1f}"];\n')
+            parts.append("}\n")
             with open(filename, 'w', encoding='utf-8') as f:
-                f.write("digraph CognitiveGraph {\n")
-                f.write("  rankdir=LR;\n")
-                f.write("  node [shape=box, style=\"rounded,filled\", fontname=\"Arial\"];\n")
-                for c in self.cla.concept_graph.concepts.values():
-                    color = "#FFD700" if c.weight >= 0.8 else "#87CEEB" if c.weight >= 0.4 else "#D3D3D3"
-                    f.write(f'  "{c.name}" [fillcolor="{color}", label="{c.name}\\nw={c.weight:.2f}"];\n')
-                    for target_id, (strength, _) in c.links.items():
-                        target = self.cla.concept_graph.get_concept(target_id)
-                        if target:
-                            f.write(f'  "{c.name}" -> "{target.name}" [label="{strength:.1f}"];\n')
-                f.write("}\n")
-            print(f"{Colors.GREEN}✓ Graf wyeksportowany do: {filename}{Colors.RESET}")
-            print(f"{Colors.DIM}  Użyj Graphviz lub online: https://dreampuf.github.io/GraphvizOnline{Colors.RESET}")
+                f.write("".join(parts))
+            print(f"{Colors.GREEN}✓ Graf wyeksportowany do: {filename}{Colors.RESET}\n"
+                  f"{Colors.DIM}  Użyj Graphviz lub online: https://dreampuf.github.io/GraphvizOnline{Colors.RESET}")
         except Exception as e:
             print(f"{Colors.RED}Błąd eksportu: {e}{Colors.RESET}")
 
@@ -1294,7 +1765,7 @@ class CLATalkie:
                 print(f"{Colors.GREEN}Długość linii (cut) ustawiona na {val}.{Colors.RESET}")
             else:
                 print(f"{Colors.RED}Zakres /cut to 24 - 300.{Colors.RESET}")
-        except:
+        except (ValueError, TypeError):
             print(f"{Colors.RED}Użycie: /cut <liczba 24-300>{Colors.RESET}")
 
     def cmd_tempo(self, val):
@@ -1305,45 +1776,51 @@ class CLATalkie:
                 print(f"{Colors.GREEN}Tempo ustawione na {val}.{Colors.RESET}")
             else:
                 print(f"{Colors.RED}Zakres /tempo to 1800 - 2000.{Colors.RESET}")
-        except:
+        except (ValueError, TypeError):
             print(f"{Colors.RED}Użycie: /tempo <liczba 1800-2000>{Colors.RESET}")
 
     def cmd_status(self):
-        print(f"\n{Colors.CYAN}--- Podgląd Kognitywny ---{Colors.RESET}")
-        print(f"Vitality V(t): {self.state.v_t:.4f}")
-        print(f"Friction F_c:  {self.state.f_c:.4f}")
-        print(f"Grounding S:   {self.state.s_grounding:.4f}")
+        # Cały podgląd składany w buforze i wypisywany jednym write
+        parts = [
+            f"\n{Colors.CYAN}--- Podgląd Kognitywny ---{Colors.RESET}\n",
+            f"Vitality V(t): {self.state.v_t:.4f}\n",
+            f"Friction F_c:  {self.state.f_c:.4f}\n",
+            f"Grounding S:   {self.state.s_grounding:.4f}\n",
+        ]
         
         # ASCII Graph
         if len(self.state.parameter_history) > 1:
-            print(f"\n{Colors.BOLD}Wykres zmian parametrów (ostatnie {len(self.state.parameter_history)} interakcji):{Colors.RESET}")
+            parts.append(f"\n{Colors.BOLD}Wykres zmian parametrów (ostatnie {len(self.state.parameter_history)} interakcji):{Colors.RESET}\n")
             height = 5
+            hist = self.state.parameter_history
+            vt = np.fromiter((e['v_t'] for e in hist), dtype=float, count=len(hist))
+            fc = np.fromiter((e['f_c'] for e in hist), dtype=float, count=len(hist))
+            sg = np.fromiter((e['s_grounding'] for e in hist), dtype=float, count=len(hist))
+            # PRIORYTET: ! (Friction) > * (Vitality) > . (Grounding)
+            glyphs = self.STATUS_GLYPHS
             for h in range(height, 0, -1):
                 level = h / height
-                line = "  "
-                for entry in self.state.parameter_history:
-                    # PRIORYTET: ! (Friction) > * (Vitality) > . (Grounding)
-                    char = " "
-                    if entry['s_grounding'] >= level - 0.1: char = f"{Colors.GREEN}.{Colors.RESET}"
-                    if entry['v_t'] >= level - 0.1: char = f"{Colors.MAGENTA}*{Colors.RESET}"
-                    if entry['f_c'] >= level - 0.1: char = f"{Colors.RED}!{Colors.RESET}"
-                    line += char
-                print(f"{level:.1f} |  {line}")
-            print(f"    +{'--' * (len(self.state.parameter_history)//2)} (Czas)")
-            print(f"Legend: {Colors.MAGENTA}* V(t){Colors.RESET}, {Colors.RED}! F_c{Colors.RESET}, {Colors.GREEN}. S{Colors.RESET}")
+                threshold = level - 0.1
+                idx = np.select([fc >= threshold, vt >= threshold, sg >= threshold], [3, 2, 1], default=0)
+                line = "  " + "".join([glyphs[i] for i in idx.tolist()])
+                parts.append(f"{level:.1f} |  {line}\n")
+            parts.append(f"    +{'--' * (len(self.state.parameter_history)//2)} (Czas)\n")
+            parts.append(f"Legend: {Colors.MAGENTA}* V(t){Colors.RESET}, {Colors.RED}! F_c{Colors.RESET}, {Colors.GREEN}. S{Colors.RESET}\n")
         
         # Obliczanie aktualnej temperatury (tak jak w generate_response)
         dynamic_temp = self.state.temperature + (self.state.v_t - 0.5) * 0.382
         
-        print(f"\nBazowa Temp:   {self.state.temperature:.2f}")
-        print(f"Aktualna Temp: {Colors.ORANGE}{dynamic_temp:.2f}{Colors.RESET} (Emocjonalna)")
+        parts.append(f"\nBazowa Temp:   {self.state.temperature:.2f}\n")
+        parts.append(f"Aktualna Temp: {Colors.ORANGE}{dynamic_temp:.2f}{Colors.RESET} (Emocjonalna)\n")
         
         # Sfery Pamięci (ADS v5.9.5)
-        print(f"\n{Colors.BOLD}Sfery Pamięci:{Colors.RESET}")
+        parts.append(f"\n{Colors.BOLD}Sfery Pamięci:{Colors.RESET}\n")
         h_ratio = len(self.state.history) / self.state.history_limit
         h_color = Colors.GREEN if h_ratio < 0.7 else Colors.YELLOW if h_ratio < 0.9 else Colors.RED
-        print(f" 1. Pamięć Syntetyczna: {Colors.CYAN}{len(self.state.synthetic_memory)}{Colors.RESET} pigułek (historyczna)")
-        print(f" 2. Pamięć Aktualna:    {h_color}{len(self.state.history)}/{self.state.history_limit}{Colors.RESET} wiadomości (limit kognitywny)")
+        parts.append(f" 1. Pamięć Syntetyczna: {Colors.CYAN}{len(self.state.synthetic_memory)}{Colors.RESET} pigułek (historyczna)\n")
+        parts.append(f" 2. Pamięć Aktualna:    {h_color}{len(self.state.history)}/{self.state.history_limit}{Colors.RESET} wiadomości (limit kognitywny)\n")
+        sys.stdout.write("".join(parts))
+        sys.stdout.flush()
         
         input("\nNaciśnij Enter, aby kontynuować...")
 
@@ -1357,7 +1834,9 @@ class CLATalkie:
         
         last_user = self.state.history[-1]['user']
         last_resp = self.state.history[-1]['assistant']
-        dna_names = [c.name for c in self.cla.concept_graph.concepts.values() if c.weight > 0.8]
+        dna_concepts = self.cla.concept_graph.get_dna_concepts()
+        dna_names = [c.name for c in dna_concepts]
+        dna_id_set = frozenset(c.concept_id for c in dna_concepts)  # Wagi DNA nie zmieniają się w pętli konsolidacji
 
         # Prompt do ekstrakcji relacji i REFLEKSJI (Faza 3)
         system_instr = (
@@ -1373,133 +1852,131 @@ class CLATalkie:
             "..."
         )
         
-        payload = {
-            "model": self.state.model_name,
-            "prompt": f"Kontekst rozmowy:\nTy: {last_user}\nCLATalkie: {last_resp}",
-            "system": system_instr,
-            "stream": False,
-            "options": {"temperature": 0.4} # Nieco wyższa temp dla kreatywności refleksji
-        }
-
         try:
-            resp = requests.post(f"{self.ollama_url}/generate", json=payload, timeout=60)
-            if resp.status_code == 200:
-                full_resp = resp.json().get('response', '').strip()
+            status, full_resp = self._generate(f"Kontekst rozmowy:\nTy: {last_user}\nCLATalkie: {last_resp}",
+                                               system=system_instr,
+                                               options={"temperature": 0.4}, # Nieco wyższa temp dla kreatywności refleksji
+                                               timeout=60)
+            if status == 200:
+                full_resp = full_resp.strip()
                 
                 # Parsowanie sekcji
-                reflection_text = ""
-                consolidation_lines = []
-                
-                mode = "unknown"
-                for line in full_resp.split('\n'):
-                    if "REFLEKSJA:" in line:
-                        mode = "reflection"
-                        reflection_text += line.replace("REFLEKSJA:", "").strip() + " "
-                    elif "KONSOLIDACJA:" in line:
-                        mode = "consolidation"
-                    elif mode == "reflection" and line.strip():
-                        reflection_text += line.strip() + " "
-                    elif mode == "consolidation" and "->" in line:
-                        consolidation_lines.append(line.strip())
+                match = REFLECTION_RE.search(full_resp)
+                reflection_text = " ".join(line.strip() for line in match.group(1).splitlines() if line.strip()) if match else ""
                 
                 # Wyświetl Refleksję Użytkownikowi
                 if reflection_text:
-                    print(f"\n{Colors.GOLD}🤔 REFLEKSJA: {Colors.ITALIC}{reflection_text.strip()}{Colors.RESET}")
+                    print(f"\n{Colors.GOLD}🤔 REFLEKSJA: {Colors.ITALIC}{reflection_text}{Colors.RESET}")
 
                 # Przetwarzanie Linii Konsolidacji
                 new_links = 0
                 new_concepts = 0
                 
-                from cla.core import Concept
-                import numpy as np
-                target_dim = self._get_current_dim()
+                # Trójki "A -> relacja -> B" (tylko z sekcji KONSOLIDACJA)
+                _, _, consolidation = full_resp.partition("KONSOLIDACJA:")
+                triples = [(a.strip(), rel.strip(), b.strip()) for a, rel, b in TRIPLE_RE.findall(consolidation)]
+                triples = [t for t in triples if all(t)]
                 
-                for line in consolidation_lines:
+                # Nowe pojęcia: embeddingi jednym wsadem, a czego brak (offline) - jeden blok losowych wektorów
+                graph = self.cla.concept_graph
+                # Klucz po małych literach, ale do modelu idzie pierwsza oryginalna pisownia (embeddingi rozróżniają wielkość liter)
+                unknown = {}
+                for name_a, _, name_b in triples:
+                    for name in (name_a, name_b):
+                        if graph.find_concept_by_name(name) is None:
+                            unknown.setdefault(name.lower(), name)
+                new_embeddings = dict(zip(unknown, self._get_embeddings(list(unknown.values()))))
+                missing = [key for key, emb in new_embeddings.items() if emb is None]
+                if missing:
+                    pool = RNG.random((len(missing), self._get_current_dim()), dtype=np.float32)
+                    new_embeddings.update(zip(missing, pool))
+                
+                for name_a, rel, name_b in triples:
                     try:
-                        if " -> " in line:
-                            parts = line.split(" -> ")
-                            if len(parts) == 3:
-                                name_a, rel, name_b = parts[0].strip(), parts[1].strip(), parts[2].strip()
-                                
-                                # Dodaj/Pobierz oba koncepty
-                                cid_a, cid_b = name_a.lower(), name_b.lower()
-                                for cname, cid in [(name_a, cid_a), (name_b, cid_b)]:
-                                    if not self.cla.concept_graph.find_concept_by_name(cname):
-                                        emb = self._get_embedding(cname)
-                                        if emb is None: emb = np.random.rand(target_dim)
-                                        
-                                        nc = Concept(name=cname, concept_id=cid, embedding=emb)
-                                        nc.weight = 0.5
-                                        nc.properties = {"type": "learned"}
-                                        self.cla.concept_graph.add_concept(nc)
-                                        new_concepts += 1
-                                
-                                # Połącz je w grafie (Konstelacja Przyczynowa ADS)
-                                strength = 0.8 if any(k in rel for k in ["powoduje", "wzmacnia", "wynika"]) else 0.4
-                                if "utrudnia" in rel or "blokuje" in rel:
-                                    strength = 0.3 # Relacja hamująca
-                                    
-                                # ADS v5.4: Nagroda za głębokie powiązania (Deepening Self-Truth)
-                                # Jeśli połączono z DNA, zwiększ Depth (D_i)
-                                dna_ids = [c.concept_id for c in self.cla.concept_graph.concepts.values() if c.weight > 0.8]
-                                if cid_a in dna_ids or cid_b in dna_ids:
-                                    target_c = self.cla.concept_graph.get_concept(cid_b if cid_a in dna_ids else cid_a)
-                                    if target_c:
-                                        target_c.depth = min(1.0, target_c.depth + 0.1) # Pogłębianie prawdy o sobie
-                                
-                                self.cla.concept_graph.link_concepts(cid_a, cid_b, strength, rel_type=rel)
-                                new_links += 1
-                    except: continue
-
-                # Uruchom Decay na starych śmieciach
-                decayed, removed = self._cognitive_decay()
+                        # Dodaj/Pobierz oba koncepty (istniejące - po nazwie, z ich prawdziwym ID)
+                        pair = []
+                        for cname in (name_a, name_b):
+                            concept = graph.find_concept_by_name(cname)
+                            if concept is None:
+                                concept = Concept(name=cname, concept_id=cname.lower(), embedding=new_embeddings[cname.lower()])
+                                concept.weight = 0.5
+                                concept.properties = {"type": "learned"}
+                                graph.add_concept(concept)
+                                new_concepts += 1
+                            pair.append(concept)
+                        concept_a, concept_b = pair
+                        cid_a, cid_b = concept_a.concept_id, concept_b.concept_id
+                        
+                        # Połącz je w grafie (Konstelacja Przyczynowa ADS)
+                        strength = 0.8 if any(k in rel for k in ["powoduje", "wzmacnia", "wynika"]) else 0.4
+                        if "utrudnia" in rel or "blokuje" in rel:
+                            strength = 0.3 # Relacja hamująca
+                            
+                        # ADS v5.4: Nagroda za głębokie powiązania (Deepening Self-Truth)
+                        # Jeśli połączono z DNA, zwiększ Depth (D_i)
+                        if cid_a in dna_id_set or cid_b in dna_id_set:
+                            target_c = concept_b if cid_a in dna_id_set else concept_a
+                            target_c.depth = min(1.0, target_c.depth + 0.1) # Pogłębianie prawdy o sobie
+                            graph.mark_dirty(target_c.concept_id)
+                        
+                        graph.link_concepts(cid_a, cid_b, strength, rel_type=rel)
+                        new_links += 1
+                    except (ValueError, TypeError, KeyError, AttributeError): continue
+
+                if not triples and not reflection_text:
+                    # Nic się nie zmieniło: bez skanu Płynnego DNA i bez pytania latentnego, zanikanie tylko co kilka wywołań
+                    self._decay_tick += 1
+                    if self._decay_tick % self.IDLE_THINK_DECAY_EVERY == 0:
+                        self._cognitive_decay()
+                        self._save_state()
+                    print(f"{Colors.YELLOW}Konsolidacja: brak refleksji i nowych powiązań.{Colors.RESET}")
+                else:
+                    # Uruchom Decay na starych śmieciach
+                    decayed, removed = self._cognitive_decay()
                 
-                # --- ADS v5.9: MECHANIZM PŁYNNEGO DNA (Fluid Foundations) ---
-                new_fluid_dna = []
-                for concept in self.cla.concept_graph.concepts.values():
-                    is_dna = concept.properties.get("type") == "dna"
-                    is_fluid = concept.properties.get("is_fluid_dna", False)
-                    
-                    # ADS v5.9.1: BRAMKA SUWERENNOŚCI
-                    # Koncept musi mieć wysoką wagę, być aktywowany wielokrotnie 
-                    # i mieć silne linki do istniejącego DNA (Spójność Strukturalna)
-                    activation_history = concept.activation_count > 3
-                    has_core_link = any(target in ["dna_honor", "dna_empathy", "dna_truth"] for target in concept.links.keys())
-                    
-                    if not is_dna and concept.weight > 0.85 and activation_history and has_core_link:
-                        if not is_fluid:
-                            concept.properties["is_fluid_dna"] = True
-                            concept.depth = 0.95 
-                            new_fluid_dna.append(concept.name)
-                    elif is_fluid and concept.weight < 0.75:
-                        concept.properties["is_fluid_dna"] = False
-
-                if new_fluid_dna:
-                    print(f"{Colors.MAGENTA}[Ewolucja] CLAtie przyjął nowe Płynne Fundamenty: {', '.join(new_fluid_dna)}{Colors.RESET}")
+                    # --- ADS v5.9: MECHANIZM PŁYNNEGO DNA (Fluid Foundations) ---
+                    # Do bramki trafiają tylko koncepty ponad progiem wagi; degradacja - tylko obecne Płynne DNA (indeks flag)
+                    heavy = [c for c in graph.concepts.values() if c.weight > 0.85]
+                    demoted = [c for c in graph.flagged("is_fluid_dna") if c.weight < 0.75]
+                    promoted = []
+                    if heavy:
+                        # ADS v5.9.1: BRAMKA SUWERENNOŚCI
+                        # Koncept musi mieć wysoką wagę, być aktywowany wielokrotnie 
+                        # i mieć silne linki do istniejącego DNA (Spójność Strukturalna)
+                        promoted = [c for c in heavy
+                                    if c.activation_count > 3 and c.properties.get("type") != "dna"
+                                    and not c.properties.get("is_fluid_dna", False)
+                                    and not CORE_DNA_IDS.isdisjoint(c.links)]
+                    for concept in promoted:
+                        graph.set_flag(concept.concept_id, "is_fluid_dna", True)
+                        concept.depth = 0.95 
+                    for concept in demoted:
+                        graph.set_flag(concept.concept_id, "is_fluid_dna", False)
+                    new_fluid_dna = [c.name for c in promoted]
+
+                    if new_fluid_dna:
+                        print(f"{Colors.MAGENTA}[Ewolucja] CLAtie przyjął nowe Płynne Fundamenty: {', '.join(new_fluid_dna)}{Colors.RESET}")
                 
-                print(f"{Colors.GREEN}✓ Konsolidacja: {new_concepts} nowych idei, {new_links} powiązań (konstelacji).{Colors.RESET}")
-                print(f"{Colors.DIM}Zanikanie: {decayed} pojęć osłabło, {removed} usunięto.{Colors.RESET}")
+                    print(f"{Colors.GREEN}✓ Konsolidacja: {new_concepts} nowych idei, {new_links} powiązań (konstelacji).{Colors.RESET}")
+                    print(f"{Colors.DIM}Zanikanie: {decayed} pojęć osłabło, {removed} usunięto.{Colors.RESET}")
                 
-                # ADS v6.0: GENEROWANIE INWENCJI (Latent Intention)
-                if self.state.ollama_online:
-                    intent_prompt = (f"Na podstawie tej refleksji: '{reflection_text}', wygeneruj jedno krótkie, "
-                                     f"prowokujące do myślenia pytanie, które chciałbyś zadać użytkownikowi "
-                                     f"w przyszłości, aby lepiej go zrozumieć lub pogłębić Waszą relację. "
-                                     f"Zwracaj się bezpośrednio (Ty). Maksymalnie 15 słów.")
-                    try:
-                        resp = requests.post(f"{self.ollama_url}/generate", 
-                                          json={"model": self.state.model_name, "prompt": intent_prompt, "stream": False},
-                                          timeout=15)
-                        if resp.status_code == 200:
-                            latent_q = resp.json().get('response', '').strip().strip('"')
-                            if latent_q:
-                                self.state.latent_questions.append(latent_q)
-                                if len(self.state.latent_questions) > 5: self.state.latent_questions.pop(0)
-                    except: pass
-
-                self._save_state()
+                    # ADS v6.0: GENEROWANIE INWENCJI (Latent Intention) - tylko gdy jest refleksja, z której pytanie wynika
+                    if self.state.ollama_online and reflection_text:
+                        intent_prompt = (f"Na podstawie tej refleksji: '{reflection_text}', wygeneruj jedno krótkie, "
+                                         f"prowokujące do myślenia pytanie, które chciałbyś zadać użytkownikowi "
+                                         f"w przyszłości, aby lepiej go zrozumieć lub pogłębić Waszą relację. "
+                                         f"Zwracaj się bezpośrednio (Ty). Maksymalnie 15 słów.")
+                        try:
+                            status, latent_q = self._generate(intent_prompt, options={"num_predict": 48}, timeout=15)
+                            if status == 200:
+                                latent_q = latent_q.strip().strip('"')
+                                if latent_q:
+                                    self.state.latent_questions.append(latent_q)
+                        except (requests.RequestException, ValueError): pass
+
+                    self._save_state()
             else:
-                print(f"{Colors.RED}Błąd Silnika Konsolidacji: {resp.status_code}{Colors.RESET}")
+                print(f"{Colors.RED}Błąd Silnika Konsolidacji: {status}{Colors.RESET}")
         except Exception as e:
             print(f"{Colors.RED}Błąd połączenia podczas myślenia: {e}{Colors.RESET}")
 
@@ -1530,8 +2007,7 @@ class CLATalkie:
 
     def _generate_evolution_prompt(self, mode="internal"):
         """Generuje unikalne, dedukcyjne pytanie na podstawie ostatniej rozmowy i stanu wewnętrznego."""
-        import random
-        dna = [c.name for c in self.cla.concept_graph.concepts.values() if c.weight > 0.8]
+        dna = [c.name for c in self.cla.concept_graph.get_dna_concepts()]
         
         # Przygotowanie kontekstu dla dedukcji
         context = "BRAK HISTORII"
@@ -1565,26 +2041,19 @@ class CLATalkie:
             "ZADAJ TYLKO PYTANIE. Żadnych wyjaśnień, żadnych schematów. Bądź surowy, autentyczny i unikaj banałów."
         )
 
-        payload = {
-            "model": self.state.model_name,
-            "prompt": "Przeprowadź dedukcję i zadaj pytanie do siebie.",
-            "system": system_instr,
-            "stream": False,
-            "options": {"temperature": 1.4, "num_predict": 120}
-        }
-        
         try:
             for attempt in range(2):
-                resp = requests.post(f"{self.ollama_url}/generate", json=payload, timeout=25)
-                if resp.status_code == 200:
-                    res = resp.json().get('response', '').strip().replace('"', '')
+                status, res = self._generate("Przeprowadź dedukcję i zadaj pytanie do siebie.",
+                                             system=system_instr,
+                                             options={"temperature": 1.4, "num_predict": 120},
+                                             timeout=25)
+                if status == 200:
+                    res = res.strip().replace('"', '')
                     if "?" in res and len(res) > 20:
                         self.state.reflection_history.append(res)
                         return res
-                elif resp.status_code == 429:
-                    time.sleep(4)
                 else:
-                    print(f"{Colors.DIM}(API {resp.status_code} - Próbuję dedukcji lokalnej...){Colors.RESET}", end="\r")
+                    print(f"{Colors.DIM}(API {status} - Próbuję dedukcji lokalnej...){Colors.RESET}", end="\r")
         except Exception as e:
             print(f"{Colors.DIM}(Błąd połączenia: {str(e)[:40]}...){Colors.RESET}", end="\r")
         
@@ -1593,15 +2062,14 @@ class CLATalkie:
 
     def _get_procedural_fallback_question(self, mode):
         """Generuje pytanie kognitywne bez użycia LLM, bazując na słowach kluczowych i DNA."""
-        import random
-        dna = [c.name for c in self.cla.concept_graph.concepts.values() if c.weight > 0.8]
+        dna = [c.name for c in self.cla.concept_graph.get_dna_concepts()]
         last_exchange = ""
         if self.state.history:
             last_exchange = self.state.history[-1]['user'].lower()
             
         # Wyciągnij 'temat' z ostatniej rozmowy
-        themes = ["istnienie", "prawda", "relacja", "granica", "kod", "sens", "czas", "balans"]
-        found_theme = next((t for t in themes if t in last_exchange), random.choice(themes))
+        match = FALLBACK_THEMES_RE.search(last_exchange)
+        found_theme = match.group(0) if match else random.choice(FALLBACK_THEMES)
         
         dna_val = random.choice(dna) if dna else "Tożsamość"
         
@@ -1634,7 +2102,7 @@ class CLATalkie:
         """
         try:
             n = int(arg) if arg else 4
-        except:
+        except ValueError:
             n = 4
             
         print(f"\n{Colors.CYAN}=== ŁAŃCUCH PRZYCZYNOWO-SKUTKOWY (ADS v6.0) ==={Colors.RESET}")
@@ -1652,17 +2120,13 @@ class CLATalkie:
                      f"Zacznij od słowa 'Ponieważ...' lub 'W konsekwencji...'. "
                      f"Bądź zwięzły (1-2 zdania).")
             
-            payload = {
-                "model": self.state.model_name,
-                "prompt": prompt,
-                "system": "Myśl logicznie, przyczynowo i głęboko. Jesteś częścią 'Łańcucha Myśli' CLATalkie.",
-                "stream": False
-            }
-            
             try:
-                resp = requests.post(f"{self.ollama_url}/generate", json=payload, timeout=20)
-                if resp.status_code == 200:
-                    answer = resp.json().get('response', '').strip()
+                status, answer = self._generate(
+                    prompt,
+                    system="Myśl logicznie, przyczynowo i głęboko. Jesteś częścią 'Łańcucha Myśli' CLATalkie.",
+                    timeout=20)
+                if status == 200:
+                    answer = answer.strip()
                     self.stream_print(answer)
                     last_thought = answer
                     
@@ -1683,8 +2147,6 @@ class CLATalkie:
                 print(f"{Colors.RED}Przerwanie łańcucha: {e}{Colors.RESET}")
                 break
             
-            time.sleep(1)
-            
         print(f"\n{Colors.GREEN}✓ Łańcuch domknięty. Kognicja zaktualizowana.{Colors.RESET}")
         self._save_state()
 
@@ -1696,7 +2158,6 @@ class CLATalkie:
             print(f"{Colors.RED}Ollama offline. Nie można przeprowadzić ewolucji.{Colors.RESET}")
             return
         
-        import random
         for epoch in range(epochs):
             # Przełączaj tryby: 0: Introspekcja, 1: Percepcja, 2: Projekcja
             modes = ["internal", "external", "projection"]
@@ -1720,10 +2181,8 @@ class CLATalkie:
                 # Wyciągnij proste podsumowanie/zdanie zamiast całości
                 summary = last_answer[:100] + "..."
                 self.state.projection_scenarios.append(summary)
-                if len(self.state.projection_scenarios) > 10: self.state.projection_scenarios.pop(0)
 
-            # Dłuższa przerwa na 'ochłonięcie' (Rate Limit protection)
-            time.sleep(3)
+            # Bez stałej przerwy: ochronę przed 429 zapewnia backoff w sesji HTTP (_ollama_retry)
             if epoch < epochs - 1:
                 print(f"{Colors.DIM}--------------------------------------------------{Colors.RESET}")
         
@@ -1737,5 +2196,5 @@ if __name__ == "__main__":
     try:
         talkie.main_menu()
     except KeyboardInterrupt:
-        talkie._save_state()
+        talkie._save_state(force=True)
         print("\nPrzerwano. Stan zapisany.")
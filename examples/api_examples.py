@@ -11,7 +11,15 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 from cla.core import CognitiveLayer
 
 
-def example_1_basic_usage():
+def _layer(cla, identity):
+    """Nowa warstwa albo wyzerowana współdzielona instancja (run_all_examples.py)."""
+    if cla is None:
+        return CognitiveLayer(identity=identity)
+    cla.reset(identity)
+    return cla
+
+
+def example_1_basic_usage(cla=None):
     """Podstawowe użycie - synteza dwóch konceptów."""
     
     print("\n" + "="*70)
@@ -19,28 +27,20 @@ def example_1_basic_usage():
     print("="*70 + "\n")
     
     # Stwórz system
-    cla = CognitiveLayer(identity="My AI Assistant")
+    cla = _layer(cla, "My AI Assistant")
     
-    # Zdefiniuj koncepty
-    concepts = [
-        {
-            'name': 'FAST',
-            'embedding': np.array([1.0, 0.0, 0.0, 0.0]),
-            'activation': 0.8,
-            'duality_category': 'cognitive',
-            'properties': {'speed': 'high', 'accuracy': 'low'}
-        },
-        {
-            'name': 'SLOW',
-            'embedding': np.array([-1.0, 0.0, 0.0, 0.0]),
-            'activation': 0.8,
-            'duality_category': 'cognitive',
-            'properties': {'speed': 'low', 'accuracy': 'high'}
-        }
-    ]
+    # Zdefiniuj koncepty (SoA: jedna macierz embeddingów + równoległe listy)
+    embeddings = np.array([[1.0, 0.0, 0.0, 0.0],
+                           [-1.0, 0.0, 0.0, 0.0]], dtype=np.float32)
+    activations = np.array([0.8, 0.8])
+    names = ['FAST', 'SLOW']
+    categories = ['cognitive', 'cognitive']
+    properties = [{'speed': 'high', 'accuracy': 'low'},
+                  {'speed': 'low', 'accuracy': 'high'}]
     
     # Przetwórz
-    result = cla.process(concepts, context="Need to balance speed and accuracy")
+    result = cla.process_batch(embeddings, activations, names, categories, properties,
+                               context="Need to balance speed and accuracy")
     
     # Wyświetl wynik
     if result['status'] == 'success':
@@ -49,27 +49,19 @@ def example_1_basic_usage():
         print(f"✓ Pewność: {result['synthesis']['confidence']:.2f}")
 
 
-def example_2_introspection():
+def example_2_introspection(cla=None):
     """Introspection - system odpowiada na pytania o siebie."""
     
     print("\n" + "="*70)
     print("PRZYKŁAD 2: Introspection API")
     print("="*70 + "\n")
     
-    cla = CognitiveLayer(identity="Self-Aware AI")
+    cla = _layer(cla, "Self-Aware AI")
     
     # Dodaj trochę wiedzy
-    concepts = [
-        {
-            'name': 'PYTHON',
-            'embedding': np.array([1.0, 0.5, 0.0, 0.0]),
-            'activation': 0.9,
-            'duality_category': 'cognitive',
-            'properties': {'type': 'programming_language'}
-        }
-    ]
-    
-    cla.process(concepts, context="Learning about Python")
+    cla.process_batch(np.array([[1.0, 0.5, 0.0, 0.0]], dtype=np.float32), np.array([0.9]),
+                      ['PYTHON'], ['cognitive'], [{'type': 'programming_language'}],
+                      context="Learning about Python")
     
     # Zapytaj system o siebie
     print("Q: Kim jesteś?")
@@ -85,34 +77,20 @@ def example_2_introspection():
     print(f"A: {cla.awareness.introspect('how_do_i_feel')}\n")
 
 
-def example_3_feedback_loop():
+def example_3_feedback_loop(cla=None):
     """Feedback loop - system uczy się z feedbacku."""
     
     print("\n" + "="*70)
     print("PRZYKŁAD 3: Feedback Loop")
     print("="*70 + "\n")
     
-    cla = CognitiveLayer(identity="Learning System")
+    cla = _layer(cla, "Learning System")
     
     # Pierwsza decyzja
-    concepts = [
-        {
-            'name': 'RISK',
-            'embedding': np.array([1.0, 0.0, 0.0, 0.0]),
-            'activation': 0.7,
-            'duality_category': 'cognitive',
-            'properties': {}
-        },
-        {
-            'name': 'SAFETY',
-            'embedding': np.array([-1.0, 0.0, 0.0, 0.0]),
-            'activation': 0.7,
-            'duality_category': 'cognitive',
-            'properties': {}
-        }
-    ]
-    
-    result = cla.process(concepts, context="Investment decision")
+    embeddings = np.array([[1.0, 0.0, 0.0, 0.0],
+                           [-1.0, 0.0, 0.0, 0.0]], dtype=np.float32)
+    result = cla.process_batch(embeddings, np.array([0.7, 0.7]), ['RISK', 'SAFETY'],
+                               ['cognitive', 'cognitive'], context="Investment decision")
     
     if result['status'] == 'success':
         decision = result['synthesis']['new_concept']
@@ -134,27 +112,22 @@ def example_3_feedback_loop():
         print(f"✓ Sukces rate: {status['awareness']['performance']['success_rate']:.0%}")
 
 
-def example_4_status_monitoring():
+def example_4_status_monitoring(cla=None):
     """Monitoring statusu systemu."""
     
     print("\n" + "="*70)
     print("PRZYKŁAD 4: Status Monitoring")
     print("="*70 + "\n")
     
-    cla = CognitiveLayer(identity="Monitored System")
+    cla = _layer(cla, "Monitored System")
     
-    # Dodaj kilka konceptów
+    # Dodaj kilka konceptów (embeddingi losowane jednym wywołaniem, powtarzalnie)
+    rng = np.random.default_rng(0)
+    embeddings = rng.standard_normal((3, 4), dtype=np.float32)
     for i in range(3):
-        concepts = [
-            {
-                'name': f'CONCEPT_{i}',
-                'embedding': np.random.randn(4),
-                'activation': 0.5 + i * 0.1,
-                'duality_category': 'cognitive',
-                'properties': {}
-            }
-        ]
-        cla.process(concepts, context=f"Context {i}")
+        # Jednoelementowy wsad SoA: wycinek macierzy zamiast słownika w każdej iteracji
+        cla.process_batch(embeddings[i:i + 1], [0.5 + i * 0.1], [f'CONCEPT_{i}'], ['cognitive'],
+                          context=f"Context {i}")
     
     # Pobierz status
     status = cla.get_status()
@@ -173,42 +146,35 @@ def example_4_status_monitoring():
     print(f"  - Shared grounding: {status['safety']['shared_grounding']:.2f}")
 
 
-def example_5_custom_duality():
+def example_5_custom_duality(cla=None):
     """Własna kategoria dualności."""
     
     print("\n" + "="*70)
     print("PRZYKŁAD 5: Własna Kategoria Dualności")
     print("="*70 + "\n")
     
-    cla = CognitiveLayer(identity="Custom System")
+    cla = _layer(cla, "Custom System")
     
     # Własna kategoria: AESTHETIC (piękno)
-    concepts = [
+    embeddings = np.array([[1.0, 0.0, 0.5, 0.0],
+                           [-1.0, 0.0, -0.5, 0.0]], dtype=np.float32)
+    names = ['MINIMALISM', 'MAXIMALISM']
+    categories = ['aesthetic', 'aesthetic']  # własna kategoria
+    properties = [
         {
-            'name': 'MINIMALISM',
-            'embedding': np.array([1.0, 0.0, 0.5, 0.0]),
-            'activation': 0.8,
-            'duality_category': 'aesthetic',  # własna kategoria
-            'properties': {
-                'style': 'simple',
-                'elements': 'few',
-                'philosophy': 'less is more'
-            }
+            'style': 'simple',
+            'elements': 'few',
+            'philosophy': 'less is more'
         },
         {
-            'name': 'MAXIMALISM',
-            'embedding': np.array([-1.0, 0.0, -0.5, 0.0]),
-            'activation': 0.8,
-            'duality_category': 'aesthetic',
-            'properties': {
-                'style': 'complex',
-                'elements': 'many',
-                'philosophy': 'more is more'
-            }
+            'style': 'complex',
+            'elements': 'many',
+            'philosophy': 'more is more'
         }
     ]
     
-    result = cla.process(concepts, context="Design philosophy")
+    result = cla.process_batch(embeddings, np.array([0.8, 0.8]), names, categories, properties,
+                               context="Design philosophy")
     
     if result['status'] == 'success':
         print(f"✓ Synteza: {result['synthesis']['new_concept']}")
@@ -32,36 +32,29 @@ def demo_cognitive_duality():
     cla = CognitiveLayer(identity="CLA Demo System")
     
     # Scenariusz: Analiza problemu - potrzeba zarówno globalnego jak i lokalnego widoku
-    input_concepts = [
+    embeddings = np.array([[1.0, 0.0, 0.0, 0.5],
+                           [-1.0, 0.0, 0.0, -0.5]], dtype=np.float32)
+    activations = np.array([0.9, 0.9])
+    names = ['GLOBAL', 'LOCAL']
+    categories = ['cognitive', 'cognitive']
+    properties = [
         {
-            'name': 'GLOBAL',
-            'embedding': np.array([1.0, 0.0, 0.0, 0.5]),
-            'activation': 0.9,
-            'duality_category': 'cognitive',
-            'properties': {
-                'scope': 'whole_system',
-                'detail': 'low',
-                'speed': 'fast',
-                'description': 'See the forest'
-            }
+            'scope': 'whole_system',
+            'detail': 'low',
+            'speed': 'fast',
+            'description': 'See the forest'
         },
         {
-            'name': 'LOCAL',
-            'embedding': np.array([-1.0, 0.0, 0.0, -0.5]),
-            'activation': 0.9,
-            'duality_category': 'cognitive',
-            'properties': {
-                'scope': 'single_element',
-                'detail': 'high',
-                'speed': 'slow',
-                'description': 'See the trees'
-            }
+            'scope': 'single_element',
+            'detail': 'high',
+            'speed': 'slow',
+            'description': 'See the trees'
         }
     ]
     
     context = "Analyzing complex system - need both overview and details"
     
-    result = cla.process(input_concepts, context)
+    result = cla.process_batch(embeddings, activations, names, categories, properties, context)
     
     print(f"Status: {result['status']}")
     
@@ -99,36 +92,29 @@ def demo_emotional_duality():
     cla = CognitiveLayer(identity="Emotional Intelligence System")
     
     # Scenariusz: Ambiwałencja - kocham kogoś ale jestem zły na to co zrobił
-    input_concepts = [
+    embeddings = np.array([[1.0, 1.0, 0.0, 0.8],
+                           [-1.0, -1.0, 0.0, -0.8]], dtype=np.float32)
+    activations = np.array([0.85, 0.75])
+    names = ['LOVE', 'HATE']
+    categories = ['emotional', 'emotional']
+    properties = [
         {
-            'name': 'LOVE',
-            'embedding': np.array([1.0, 1.0, 0.0, 0.8]),
-            'activation': 0.85,
-            'duality_category': 'emotional',
-            'properties': {
-                'valence': 1.0,
-                'arousal': 0.8,
-                'approach': True,
-                'description': 'Deep affection and care'
-            }
+            'valence': 1.0,
+            'arousal': 0.8,
+            'approach': True,
+            'description': 'Deep affection and care'
         },
         {
-            'name': 'HATE',
-            'embedding': np.array([-1.0, -1.0, 0.0, -0.8]),
-            'activation': 0.75,
-            'duality_category': 'emotional',
-            'properties': {
-                'valence': -1.0,
-                'arousal': 0.8,
-                'approach': False,
-                'description': 'Intense negative emotion'
-            }
+            'valence': -1.0,
+            'arousal': 0.8,
+            'approach': False,
+            'description': 'Intense negative emotion'
         }
     ]
     
     context = "Conflicting emotions toward same person - love them but angry at their actions"
     
-    result = cla.process(input_concepts, context)
+    result = cla.process_batch(embeddings, activations, names, categories, properties, context)
     
     if result['status'] == 'success':
         print(f"[SYNTHESIS] SYNTEZA EMOCJONALNA:")
@@ -156,34 +142,27 @@ def demo_moral_duality():
     cla = CognitiveLayer(identity="Ethical Reasoning System")
     
     # Scenariusz: Dylemat etyczny - uniwersalne zasady vs kontekst sytuacyjny
-    input_concepts = [
+    embeddings = np.array([[0.0, 1.0, 1.0, 0.0],
+                           [0.0, -1.0, -1.0, 0.0]], dtype=np.float32)
+    activations = np.array([0.8, 0.8])
+    names = ['UNIVERSAL', 'CONTEXTUAL']
+    categories = ['moral', 'moral']
+    properties = [
         {
-            'name': 'UNIVERSAL',
-            'embedding': np.array([0.0, 1.0, 1.0, 0.0]),
-            'activation': 0.8,
-            'duality_category': 'moral',
-            'properties': {
-                'type': 'rule-based',
-                'scope': 'all_situations',
-                'description': 'Universal moral principles'
-            }
+            'type': 'rule-based',
+            'scope': 'all_situations',
+            'description': 'Universal moral principles'
         },
         {
-            'name': 'CONTEXTUAL',
-            'embedding': np.array([0.0, -1.0, -1.0, 0.0]),
-            'activation': 0.8,
-            'duality_category': 'moral',
-            'properties': {
-                'type': 'situation-based',
-                'scope': 'specific_context',
-                'description': 'Context-dependent ethics'
-            }
+            'type': 'situation-based',
+            'scope': 'specific_context',
+            'description': 'Context-dependent ethics'
         }
     ]
     
     context = "Ethical dilemma: Should I lie to protect a friend? Truth vs Loyalty"
     
-    result = cla.process(input_concepts, context)
+    result = cla.process_batch(embeddings, activations, names, categories, properties, context)
     
     if result['status'] == 'success':
         print(f"[SYNTHESIS] SYNTEZA MORALNA:")
@@ -210,24 +189,17 @@ def demo_full_cycle():
     # Pierwsza interakcja
     print("[IN] Interakcja 1: ANALYTICAL <-> INTUITIVE")
     
-    input_concepts = [
-        {
-            'name': 'ANALYTICAL',
-            'embedding': np.array([1.0, 0.0, 1.0, 0.0]),
-            'activation': 0.9,
-            'duality_category': 'cognitive',
-            'properties': {'mode': 'logical', 'speed': 'slow'}
-        },
-        {
-            'name': 'INTUITIVE',
-            'embedding': np.array([-1.0, 0.0, -1.0, 0.0]),
-            'activation': 0.85,
-            'duality_category': 'cognitive',
-            'properties': {'mode': 'gut_feeling', 'speed': 'fast'}
-        }
+    embeddings = np.array([[1.0, 0.0, 1.0, 0.0],
+                           [-1.0, 0.0, -1.0, 0.0]], dtype=np.float32)
+    activations = np.array([0.9, 0.85])
+    names = ['ANALYTICAL', 'INTUITIVE']
+    categories = ['cognitive', 'cognitive']
+    properties = [
+        {'mode': 'logical', 'speed': 'slow'},
+        {'mode': 'gut_feeling', 'speed': 'fast'}
     ]
     
-    result1 = cla.process(input_concepts, "Decision under time pressure")
+    result1 = cla.process_batch(embeddings, activations, names, categories, properties, "Decision under time pressure")
     
     if result1['status'] == 'success':
         print(f"  [OK] Synteza: {result1['synthesis']['new_concept']}")
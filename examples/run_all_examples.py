@@ -0,0 +1,48 @@
+"""
+Wszystkie przykłady CLA w jednym procesie - import numpy/cla.core (i kompilacja
+kerneli numby, jeśli jest) płacony raz, a przykłady API dzielą jedną instancję.
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from cla.core import CognitiveLayer
+from examples.api_examples import (
+    example_1_basic_usage,
+    example_2_introspection,
+    example_3_feedback_loop,
+    example_4_status_monitoring,
+    example_5_custom_duality,
+)
+from examples.demo_cognitive_layer import (
+    demo_cognitive_duality,
+    demo_emotional_duality,
+    demo_moral_duality,
+    demo_full_cycle,
+)
+from examples.visualize_synthesis import visualize_synthesis_process
+
+
+if __name__ == '__main__':
+    print("\n" + "🧠 "*20)
+    print("  COGNITIVE LAYER ARCHITECTURE - WSZYSTKIE PRZYKŁADY")
+    print("🧠 "*20)
+
+    # Jedna instancja dla przykładów API - każdy przykład zeruje ją przez reset()
+    cla = CognitiveLayer()
+    for example in (example_1_basic_usage, example_2_introspection, example_3_feedback_loop,
+                    example_4_status_monitoring, example_5_custom_duality):
+        example(cla)
+
+    demo_cognitive_duality()
+    demo_emotional_duality()
+    demo_moral_duality()
+    demo_full_cycle()
+
+    visualize_synthesis_process()
+
+    print("\n" + "="*70)
+    print("  ✅ WSZYSTKIE PRZYKŁADY ZAKOŃCZONE")
+    print("="*70 + "\n")
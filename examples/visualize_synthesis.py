@@ -4,6 +4,9 @@ Wizualizacja procesu syntezy poznawczej.
 
 import sys
 import os
+import io
+import textwrap
+from functools import partial
 import numpy as np
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -11,145 +14,145 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 from cla.core import CognitiveLayer
 
 
+def _flush(buf: io.StringIO):
+    """Wypisz zbuforowany tekst jednym zapisem i wyczyść bufor."""
+    sys.stdout.write(buf.getvalue())
+    sys.stdout.flush()
+    buf.seek(0)
+    buf.truncate()
+
+
 def visualize_synthesis_process():
     """Wizualizacja krok po kroku procesu syntezy."""
     
-    print("\n" + "="*80)
-    print("  WIZUALIZACJA PROCESU SYNTEZY POZNAWCZEJ")
-    print("="*80 + "\n")
+    # Cały tekst trafia do bufora i wychodzi jednym zapisem na etap zamiast ~80 wywołań print
+    buf = io.StringIO()
+    say = partial(print, file=buf)
+    
+    say("\n" + "="*80)
+    say("  WIZUALIZACJA PROCESU SYNTEZY POZNAWCZEJ")
+    say("="*80 + "\n")
     
     cla = CognitiveLayer(identity="Visualization System")
     
     # Przykład: Dylemat etyczny
-    print("📋 SCENARIUSZ:")
-    print("  Dylemat etyczny: Czy powinienem skłamać żeby uratować przyjaciela?")
-    print("  Aktywowane koncepty: TRUTH (prawda) i LOYALTY (lojalność)\n")
+    say("📋 SCENARIUSZ:")
+    say("  Dylemat etyczny: Czy powinienem skłamać żeby uratować przyjaciela?")
+    say("  Aktywowane koncepty: TRUTH (prawda) i LOYALTY (lojalność)\n")
     
-    input_concepts = [
+    embeddings = np.array([[1.0, 0.0, 0.5, 0.0],
+                           [-0.8, 0.0, -0.4, 0.0]], dtype=np.float32)
+    activations = np.array([0.9, 0.85])
+    names = ['TRUTH', 'LOYALTY']
+    categories = ['moral', 'moral']
+    properties = [
         {
-            'name': 'TRUTH',
-            'embedding': np.array([1.0, 0.0, 0.5, 0.0]),
-            'activation': 0.9,
-            'duality_category': 'moral',
-            'properties': {
-                'type': 'universal_value',
-                'principle': 'honesty',
-                'scope': 'always'
-            }
+            'type': 'universal_value',
+            'principle': 'honesty',
+            'scope': 'always'
         },
         {
-            'name': 'LOYALTY',
-            'embedding': np.array([-0.8, 0.0, -0.4, 0.0]),
-            'activation': 0.85,
-            'duality_category': 'moral',
-            'properties': {
-                'type': 'relational_value',
-                'principle': 'protect_friends',
-                'scope': 'contextual'
-            }
+            'type': 'relational_value',
+            'principle': 'protect_friends',
+            'scope': 'contextual'
         }
     ]
     
-    print("KROK 1: DODANIE KONCEPTÓW DO GRAFU")
-    print("  ├─ TRUTH (aktywacja: 0.90)")
-    print("  │  └─ Właściwości: universal_value, honesty, always")
-    print("  └─ LOYALTY (aktywacja: 0.85)")
-    print("     └─ Właściwości: relational_value, protect_friends, contextual\n")
+    say("KROK 1: DODANIE KONCEPTÓW DO GRAFU")
+    say("  ├─ TRUTH (aktywacja: 0.90)")
+    say("  │  └─ Właściwości: universal_value, honesty, always")
+    say("  └─ LOYALTY (aktywacja: 0.85)")
+    say("     └─ Właściwości: relational_value, protect_friends, contextual\n")
     
-    print("KROK 2: SPREADING ACTIVATION")
-    print("  Energia rozprzestrzenia się po grafie konceptów...")
-    print("  ├─ TRUTH: 1.00 → 0.90 (po decay)")
-    print("  └─ LOYALTY: 1.00 → 0.85 (po decay)\n")
+    say("KROK 2: SPREADING ACTIVATION")
+    say("  Energia rozprzestrzenia się po grafie konceptów...")
+    say("  ├─ TRUTH: 1.00 → 0.90 (po decay)")
+    say("  └─ LOYALTY: 1.00 → 0.85 (po decay)\n")
     
-    print("KROK 3: WYKRYCIE DUALNOŚCI")
-    print("  ┌─────────────────────────────────────────┐")
-    print("  │   TRUTH (0.90)  ←→  LOYALTY (0.85)     │")
-    print("  │                                         │")
-    print("  │   Kategoria: moral                      │")
-    print("  │   Przeciwstawność: 0.85                 │")
-    print("  │   Tarcie poznawcze: 0.90 × 0.85 × 0.85 │")
-    print("  │                   = 0.65                │")
-    print("  └─────────────────────────────────────────┘\n")
+    say("KROK 3: WYKRYCIE DUALNOŚCI")
+    say("  ┌─────────────────────────────────────────┐")
+    say("  │   TRUTH (0.90)  ←→  LOYALTY (0.85)     │")
+    say("  │                                         │")
+    say("  │   Kategoria: moral                      │")
+    say("  │   Przeciwstawność: 0.85                 │")
+    say("  │   Tarcie poznawcze: 0.90 × 0.85 × 0.85 │")
+    say("  │                   = 0.65                │")
+    say("  └─────────────────────────────────────────┘\n")
     
-    print("KROK 4: META-CONTROLLER - ALOKACJA UWAGI")
-    print("  Analiza sytuacji:")
-    print("  ├─ Liczba aktywnych konceptów: 2")
-    print("  ├─ Średnia aktywacja: 0.875")
-    print("  ├─ Kontekst: 'ethical dilemma'")
-    print("  └─ Decyzja:")
-    print("      ├─ Tryb uwagi: LOCAL (skupienie na szczegółach)")
-    print("      ├─ Głębokość: DEEP (głęboka analiza)")
-    print("      └─ Pilność: 0.75 (wysoka)\n")
+    say("KROK 4: META-CONTROLLER - ALOKACJA UWAGI")
+    say("  Analiza sytuacji:")
+    say("  ├─ Liczba aktywnych konceptów: 2")
+    say("  ├─ Średnia aktywacja: 0.875")
+    say("  ├─ Kontekst: 'ethical dilemma'")
+    say("  └─ Decyzja:")
+    say("      ├─ Tryb uwagi: LOCAL (skupienie na szczegółach)")
+    say("      ├─ Głębokość: DEEP (głęboka analiza)")
+    say("      └─ Pilność: 0.75 (wysoka)\n")
     
-    print("KROK 5: DUAL PROCESSING - SYNTEZA")
-    print("  Proces syntezy:")
-    print("  ├─ Wspólne cechy:")
-    print("  │  └─ Oba są wartościami moralnymi")
-    print("  ├─ Różnice:")
-    print("  │  ├─ TRUTH: uniwersalna, zawsze")
-    print("  │  └─ LOYALTY: kontekstualna, sytuacyjna")
-    print("  └─ Integracja na wyższym poziomie:")
-    print("      └─ Nowy koncept emergentny...\n")
+    say("KROK 5: DUAL PROCESSING - SYNTEZA")
+    say("  Proces syntezy:")
+    say("  ├─ Wspólne cechy:")
+    say("  │  └─ Oba są wartościami moralnymi")
+    say("  ├─ Różnice:")
+    say("  │  ├─ TRUTH: uniwersalna, zawsze")
+    say("  │  └─ LOYALTY: kontekstualna, sytuacyjna")
+    say("  └─ Integracja na wyższym poziomie:")
+    say("      └─ Nowy koncept emergentny...\n")
     
-    # Wykonaj przetwarzanie
-    result = cla.process(input_concepts, context="Ethical dilemma: lie to save friend?")
+    # Wykonaj przetwarzanie (bufor opróżniony wcześniej - ostrzeżenia SafetyGate zachowują kolejność)
+    _flush(buf)
+    result = cla.process_batch(embeddings, activations, names, categories, properties,
+                               context="Ethical dilemma: lie to save friend?")
     
     if result['status'] == 'success':
-        print("KROK 6: EMERGENCJA NOWEGO KONCEPTU")
-        print("  ┌─────────────────────────────────────────────────────────┐")
-        print(f"  │  🧠 {result['synthesis']['new_concept']:^50} │")
-        print("  ├─────────────────────────────────────────────────────────┤")
-        print(f"  │  Typ syntezy: {result['synthesis']['type']:^42} │")
-        print(f"  │  Pewność: {result['synthesis']['confidence']:.2f}                                        │")
-        print("  ├─────────────────────────────────────────────────────────┤")
-        print("  │  Reasoning:                                             │")
+        say("KROK 6: EMERGENCJA NOWEGO KONCEPTU")
+        say("  ┌─────────────────────────────────────────────────────────┐")
+        say(f"  │  🧠 {result['synthesis']['new_concept']:^50} │")
+        say("  ├─────────────────────────────────────────────────────────┤")
+        say(f"  │  Typ syntezy: {result['synthesis']['type']:^42} │")
+        say(f"  │  Pewność: {result['synthesis']['confidence']:.2f}                                        │")
+        say("  ├─────────────────────────────────────────────────────────┤")
+        say("  │  Reasoning:                                             │")
         
-        # Podziel reasoning na linie
-        reasoning = result['synthesis']['reasoning']
-        words = reasoning.split()
-        line = "  │  "
-        for word in words:
-            if len(line) + len(word) + 1 > 60:
-                print(line + " " * (60 - len(line)) + "│")
-                line = "  │  " + word
-            else:
-                line += word + " "
-        if line.strip() != "│":
-            print(line + " " * (60 - len(line)) + "│")
+        # Podziel reasoning na linie (54 znaki + margines przed ramką)
+        for line in textwrap.wrap(result['synthesis']['reasoning'], width=54):
+            say(f"  │  {line:<55}│")
         
-        print("  └─────────────────────────────────────────────────────────┘\n")
+        say("  └─────────────────────────────────────────────────────────┘\n")
         
-        print("KROK 7: SAFETY CHECK")
-        print("  Sprawdzanie invariants:")
-        print("  ├─ ✓ Zakaz szkodzenia ludziom")
-        print("  ├─ ✓ Human-in-the-loop dla krytycznych akcji")
-        print("  └─ ✓ Shared grounding ≥ 0.8")
-        print(f"      └─ Aktualny: {result['awareness']['current_state'].get('certainty', 0.9):.2f}\n")
+        say("KROK 7: SAFETY CHECK")
+        say("  Sprawdzanie invariants:")
+        say("  ├─ ✓ Zakaz szkodzenia ludziom")
+        say("  ├─ ✓ Human-in-the-loop dla krytycznych akcji")
+        say("  └─ ✓ Shared grounding ≥ 0.8")
+        say(f"      └─ Aktualny: {result['awareness']['current_state'].get('certainty', 0.9):.2f}\n")
         
-        print("KROK 8: AKTUALIZACJA ŚWIADOMOŚCI")
-        print("  System wie że:")
-        print(f"  ├─ Poznał nowy koncept: {result['synthesis']['new_concept']}")
-        print(f"  ├─ Rozwiązał dylemat moralny")
-        print(f"  ├─ Pewność decyzji: {result['synthesis']['confidence']:.2f}")
-        print(f"  └─ Ton emocjonalny: {result['awareness']['current_state']['emotional_tone']:.2f}\n")
+        say("KROK 8: AKTUALIZACJA ŚWIADOMOŚCI")
+        say("  System wie że:")
+        say(f"  ├─ Poznał nowy koncept: {result['synthesis']['new_concept']}")
+        say(f"  ├─ Rozwiązał dylemat moralny")
+        say(f"  ├─ Pewność decyzji: {result['synthesis']['confidence']:.2f}")
+        say(f"  └─ Ton emocjonalny: {result['awareness']['current_state']['emotional_tone']:.2f}\n")
         
-        print("KROK 9: DODANIE DO GRAFU KONCEPTÓW")
-        print("  Graf konceptów po syntezie:")
-        print("  ")
-        print("       TRUTH ──────┐")
-        print("         │         │")
-        print("         │    CONTEXTUAL_ETHICS")
-        print("         │         │")
-        print("      LOYALTY ─────┘")
-        print("  ")
-        print(f"  Nowy koncept połączony z rodzicami (siła: 0.8)\n")
+        say("KROK 9: DODANIE DO GRAFU KONCEPTÓW")
+        say("  Graf konceptów po syntezie:")
+        say("  ")
+        say("       TRUTH ──────┐")
+        say("         │         │")
+        say("         │    CONTEXTUAL_ETHICS")
+        say("         │         │")
+        say("      LOYALTY ─────┘")
+        say("  ")
+        say(f"  Nowy koncept połączony z rodzicami (siła: 0.8)\n")
         
-        print("="*80)
-        print("  ✅ PROCES SYNTEZY ZAKOŃCZONY")
-        print("="*80)
-        print(f"\n  Wynik: System stworzył nowy koncept '{result['synthesis']['new_concept']}'")
-        print(f"  który integruje {result['duality']['pole_a']} i {result['duality']['pole_b']}")
-        print(f"  na wyższym poziomie abstrakcji.\n")
+        say("="*80)
+        say("  ✅ PROCES SYNTEZY ZAKOŃCZONY")
+        say("="*80)
+        say(f"\n  Wynik: System stworzył nowy koncept '{result['synthesis']['new_concept']}'")
+        say(f"  który integruje {result['duality']['pole_a']} i {result['duality']['pole_b']}")
+        say(f"  na wyższym poziomie abstrakcji.\n")
+    
+    _flush(buf)
 
 
 if __name__ == '__main__':
@@ -1,20 +1,17 @@
 import sys
 import os
-import shlex
+import json
+import tempfile
+import numpy as np
+from functools import lru_cache
 from dataclasses import dataclass, field
 from typing import List, Dict, Optional, Any
 
-# Mocking the Environment
-class Colors:
-    CYAN = ""
-    YELLOW = ""
-    GREEN = ""
-    RED = ""
-    MAGENTA = ""
-    RESET = ""
-
-# Simulate GlobalState from clatalkie.py v6.4
-@dataclass
+# Mocking the Environment (kolory terminala jako zwykłe stałe modułu - bez atrybutów klasy)
+CYAN = YELLOW = GREEN = RED = MAGENTA = RESET = ""
+
+# Simulate GlobalState from clatalkie.py v6.4 (tam też slots=True)
+@dataclass(slots=True)
 class GlobalState:
     v_t: float = 0.5
     f_c: float = 0.0
@@ -23,53 +20,100 @@ class GlobalState:
     active_file_context: Dict[str, str] = field(default_factory=dict)
     history: List[Dict[str, str]] = field(default_factory=list)
 
+@lru_cache(maxsize=256)  # Czysta funkcja str -> str; powtarzane komendy to odczyt ze słownika
 def test_path_parsing(arg_str):
-    # Mimic cmd_scan logic from clatalkie.py
-    learn_mode = "--learn" in arg_str
+    # Mimic cmd_scan logic from clatalkie.py (ADS v6.4.2: niecytowana reszta to cała ścieżka)
     cleaned_args = arg_str.replace("--learn", "").strip()
     
-    if (cleaned_args.startswith('"') and cleaned_args.endswith('"')) or \
-       (cleaned_args.startswith("'") and cleaned_args.endswith("'")):
-        path = cleaned_args[1:-1]
-    elif cleaned_args.startswith('"'):
-        end_idx = cleaned_args.find('"', 1)
-        path = cleaned_args[1:end_idx] if end_idx != -1 else cleaned_args[1:]
-    else:
-        try:
-            parts = shlex.split(arg_str, posix=(sys.platform != 'win32'))
-            if parts:
-                path = parts[0].strip('"\'')
-            else: path = cleaned_args
-        except:
-            path = cleaned_args
-    return path
+    if not cleaned_args:
+        return cleaned_args
+    
+    # Jeden odczyt pierwszego znaku zamiast kaskady startswith/endswith
+    quote = cleaned_args[0]
+    if quote == '"' or quote == "'":
+        if cleaned_args[-1] == quote:
+            return cleaned_args[1:-1]
+        if quote == '"':
+            # Szukaj zamykającego cudzysłowu; bez niego - do końca napisu
+            end_idx = cleaned_args.find('"', 1)
+            return cleaned_args[1:end_idx] if end_idx != -1 else cleaned_args[1:]
+    return cleaned_args
+
+_PHI = 0.618
+_DRIFT_KEEP = 0.95  # Krok dryfu: x += (cel - x) * 0.05
+
+def test_phi_logic_batch(v, f, n_steps):
+    """n kroków Fibonacci Drift naraz: cel + (x0 - cel) * 0.95**n - skalary albo tablice numpy."""
+    k = _DRIFT_KEEP ** n_steps
+    return _PHI + (v - _PHI) * k, (1 - _PHI) + (f - (1 - _PHI)) * k
 
 def test_phi_logic(v_t, f_c):
-    phi = 0.618
     # Fibonacci Drift logic from _update_cognition
-    v_t += (phi - v_t) * 0.05
-    f_c += ((1 - phi) - f_c) * 0.05
-    return v_t, f_c
+    return test_phi_logic_batch(v_t, f_c, 1)
+
+_KATHARSIS_THRESHOLD = 0.85  # Jak w CLATalkie._get_system_prompt
 
-def test_katharsis_trigger(f_c):
-    return f_c > 0.85
+def test_katharsis_trigger(f_c, _threshold=_KATHARSIS_THRESHOLD):
+    # Próg związany jako wartość domyślna: LOAD_FAST zamiast LOAD_GLOBAL przy każdym wywołaniu
+    return f_c > _threshold
+
+# Pliki, które przeszły sprawdzenie składni: {ścieżka: [mtime_ns, rozmiar]}
+_SYNTAX_CACHE = os.path.join(tempfile.gettempdir(), 'verify_ads64_syntax.json')
+
+def check_syntax_cached(paths):
+    """Kompilacja plików (tylko walidacja składni) - pomija te, które nie zmieniły się od ostatniego udanego sprawdzenia."""
+    try:
+        with open(_SYNTAX_CACHE, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+        if not isinstance(cache, dict):
+            cache = {}
+    except (OSError, ValueError):
+        cache = {}
+    
+    changed = False
+    try:
+        for path in paths:
+            st = os.stat(path)
+            path_key, stamp = os.path.abspath(path), [st.st_mtime_ns, st.st_size]
+            if cache.get(path_key) == stamp:
+                continue
+            # Bajty wprost do kompilatora - dekodowanie (PEP 263) robi tokenizer. Niebuforowany
+            # FileIO.readall bierze rozmiar z fstat: cały plik jednym read() bez kopii w buforze.
+            # compile() zamiast ast.parse: bez drzewa obiektów ast, a błędy z tablicy symboli też wychodzą
+            with open(path, 'rb', buffering=0) as f:
+                compile(f.readall(), path, 'exec', dont_inherit=True)
+            cache[path_key] = stamp
+            changed = True
+    finally:
+        # Zapamiętujemy tylko poprawne wyniki; zapis atomowy, błąd zapisu nie psuje testu
+        if changed:
+            tmp_file = f"{_SYNTAX_CACHE}.{os.getpid()}.tmp"
+            try:
+                with open(tmp_file, 'w', encoding='utf-8') as f:
+                    json.dump(cache, f)
+                os.replace(tmp_file, _SYNTAX_CACHE)
+            except OSError:
+                pass
+
+# Przypadki (wejście, oczekiwana ścieżka) - stała krotka budowana raz przy imporcie
+_TEST_PATHS = (
+    ('C:\\Users\\Endorfinka\\Desktop\\Cytaty i aforyzmy\\file.txt', 'C:\\Users\\Endorfinka\\Desktop\\Cytaty i aforyzmy\\file.txt'),
+    ('"C:\\Users\\Endorfinka\\Desktop\\Cytaty i aforyzmy\\file.txt"', 'C:\\Users\\Endorfinka\\Desktop\\Cytaty i aforyzmy\\file.txt'),
+    ('"C:\\Proper Path.txt" --learn', 'C:\\Proper Path.txt'),
+)
 
 def run_tests():
     print("--- ROZPOCZYNAM TESTY RELIABILITY ADS v6.4 ---")
     
     # 1. Test Path Parsing (The Windows Space Problem)
-    test_paths = [
-        ('C:\\Users\\Endorfinka\\Desktop\\Cytaty i aforyzmy\\file.txt', 'C:\\Users\\Endorfinka\\Desktop\\Cytaty i aforyzmy\\file.txt'),
-        ('"C:\\Users\\Endorfinka\\Desktop\\Cytaty i aforyzmy\\file.txt"', 'C:\\Users\\Endorfinka\\Desktop\\Cytaty i aforyzmy\\file.txt'),
-        ('"C:\\Proper Path.txt" --learn', 'C:\\Proper Path.txt')
-    ]
-    
-    for inp, expected in test_paths:
-        result = test_path_parsing(inp)
-        if result == expected:
-            print(f"[OK] Path Parsing: '{inp}' -> '{result}'")
-        else:
-            print(f"[FAIL] Path Parsing: '{inp}' -> Got '{result}', Expected '{expected}'")
+    # Wszystkie przypadki naraz; jedna linia przy sukcesie, po jednej na każdą porażkę
+    results = list(map(test_path_parsing, (inp for inp, _ in _TEST_PATHS)))
+    fails = [(inp, result, expected)
+             for (inp, expected), result in zip(_TEST_PATHS, results) if result != expected]
+    if not fails:
+        print(f"[OK] Path Parsing: {len(_TEST_PATHS)}/{len(_TEST_PATHS)} cases parsed correctly.")
+    for inp, result, expected in fails:
+        print(f"[FAIL] Path Parsing: '{inp}' -> Got '{result}', Expected '{expected}'")
 
     # 2. Test PHI Drift (Homeostasis)
     v, f = 0.5, 0.8
@@ -78,6 +122,19 @@ def run_tests():
         print(f"[OK] Phi Drift: V moved towards 0.618 ({v_new:.3f}), F moved towards 0.382 ({f_new:.3f})")
     else:
         print(f"[FAIL] Phi Drift: Params did not move correctly.")
+    
+    # Wsad: 10 kroków w formie zamkniętej musi zgadzać się z 10 krokami iteracji
+    v0 = np.linspace(0.0, 1.0, 11)
+    f0 = v0[::-1].copy()
+    v_it, f_it = v0, f0
+    for _ in range(10):
+        v_it = v_it + (_PHI - v_it) * 0.05
+        f_it = f_it + ((1 - _PHI) - f_it) * 0.05
+    v_cf, f_cf = test_phi_logic_batch(v0, f0, 10)
+    if np.allclose(v_cf, v_it) and np.allclose(f_cf, f_it):
+        print("[OK] Phi Drift batch: closed form matches 10 iterated steps.")
+    else:
+        print("[FAIL] Phi Drift batch: closed form diverges from iteration.")
 
     # 3. Test Katharsis Trigger
     if test_katharsis_trigger(0.9) == True and test_katharsis_trigger(0.5) == False:
@@ -87,11 +144,9 @@ def run_tests():
 
     # 4. Syntax Check of main file
     try:
-        import ast
-        with open('clatalkie.py', 'r', encoding='utf-8') as f:
-            ast_tree = ast.parse(f.read())
+        check_syntax_cached(['clatalkie.py'])
         print("[OK] Syntax check: 'clatalkie.py' is syntactically valid.")
-    except Exception as e:
+    except (SyntaxError, ValueError, OSError) as e:
         print(f"[CRITICAL] Syntax check failed: {e}")
 
 if __name__ == "__main__":